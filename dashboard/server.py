@@ -9,8 +9,15 @@ Run:
 Then visit http://localhost:3003
 """
 
+import atexit
+import copy
+import heapq
+import importlib.util
+import math
 import os
+import pickle
 import re
+import shutil
 import subprocess
 import sys
 import json
@@ -20,16 +27,26 @@ import sqlite3
 import socket
 import threading
 import time
+from collections import OrderedDict
+from functools import lru_cache
 from queue import Queue, Empty
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import httpx
 import requests
 import websocket as ws_client
 from datetime import datetime, timedelta
 from pathlib import Path
-from flask import Flask, render_template, jsonify, redirect, url_for, request, send_file, session, Response
+from flask import Flask, render_template, jsonify, redirect, url_for, request, send_file, session, Response, g
 from flask_sock import Sock
 from werkzeug.utils import secure_filename
 
+# orjson serializes the large debug/workflow payloads much faster than stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv(Path(__file__).parent.parent / '.env')
@@ -143,13 +160,11 @@ except ImportError as e:
     PROJECTS_AVAILABLE = False
 
 # Twilio SMS Client (voice is handled by MacBook)
-try:
-    from twilio.rest import Client as TwilioClient
-    from twilio.twiml.messaging_response import MessagingResponse
-    TWILIO_AVAILABLE = True
-except ImportError:
+# The twilio package is slow to import, so only check that it is installed
+# here; get_twilio_client() and twiml_response() import it on first use.
+TWILIO_AVAILABLE = importlib.util.find_spec('twilio') is not None
+if not TWILIO_AVAILABLE:
     print("Twilio import failed - SMS features disabled")
-    TWILIO_AVAILABLE = False
 
 # Setup logging for AI Studio debugging
 logging.basicConfig(
@@ -172,6 +187,44 @@ app.secret_key = os.environ.get('FLASK_SECRET_KEY', 'dev-secret-key-change-in-pr
 app.config['TEMPLATES_AUTO_RELOAD'] = True
 app.jinja_env.auto_reload = True
 
+
+def fast_json_dumps(payload, indent=False):
+    """Serialize payload to UTF-8 JSON bytes, using orjson when it is installed.
+
+    indent=True pretty-prints with two spaces, for files meant to be read by people.
+    """
+    if not ORJSON_AVAILABLE:
+        return json.dumps(payload, indent=2 if indent else None).encode()
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+    return orjson.dumps(payload, option=option)
+
+
+def fast_json_loads(data):
+    """Parse JSON from str or bytes, using orjson when it is installed."""
+    if not ORJSON_AVAILABLE:
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+def fast_jsonify(payload, status=200):
+    """jsonify() for large payloads, using orjson when it is installed."""
+    if not ORJSON_AVAILABLE:
+        return jsonify(payload), status
+    return app.response_class(fast_json_dumps(payload), status=status, mimetype='application/json')
+
+
+def conditional_jsonify(payload):
+    """JSON response with an ETag over its body, answering If-None-Match with 304.
+
+    Cache-Control: no-cache makes browsers revalidate every time, so a
+    changed payload is picked up immediately while unchanged ones cost a
+    header-only 304.
+    """
+    response = app.response_class(fast_json_dumps(payload), mimetype='application/json')
+    response.add_etag()
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
 # Initialize Flask-Sock for WebSocket support (OpenClaw proxy)
 sock = Sock(app)
 
@@ -193,19 +246,86 @@ GENERATIONS_DIR = PROJECT_ROOT / 'data' / 'generations'
 DATABASES_DIR = PROJECT_ROOT / 'data' / 'databases'
 THEMES_FILE = PROJECT_ROOT / 'data' / 'themes.json'
 
+# Plain-string forms of the hot paths, so request handlers can use os.path
+# directly instead of building Path objects on every call
+COMFY_OUTPUT_DIR_STR = os.fspath(COMFY_DIR / 'output')
+COMFY_INPUT_DIR_STR = os.fspath(COMFY_DIR / 'input')
+GENERATIONS_DB_PATH_STR = os.fspath(DATABASES_DIR / 'generations.db')
+
+# Persistent HTTP clients so ComfyUI calls and model downloads reuse connections
+comfy_client = httpx.Client(
+    base_url=f'http://{COMFY_HOST}:{COMFY_PORT}',
+    timeout=10,
+    limits=httpx.Limits(max_keepalive_connections=4, max_connections=8),
+)
+atexit.register(comfy_client.close)
+# Shared client for the external API health checks
+health_check_client = httpx.Client(
+    timeout=httpx.Timeout(10, connect=3),
+    limits=httpx.Limits(max_keepalive_connections=4),
+)
+atexit.register(health_check_client.close)
+# Shared client for YouTube Data API calls (keeps the TLS connection warm).
+# Sized for the team video fan-out; transport retries only repeat failed
+# connection attempts, never requests that reached the server.
+youtube_client = httpx.Client(
+    base_url='https://www.googleapis.com/youtube/v3',
+    timeout=10,
+    transport=httpx.HTTPTransport(
+        retries=2,
+        limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+    ),
+)
+atexit.register(youtube_client.close)
+# Shared client for RSS feed downloads
+feed_client = httpx.Client(
+    timeout=10,
+    follow_redirects=True,
+    transport=httpx.HTTPTransport(
+        retries=2,
+        limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+    ),
+)
+atexit.register(feed_client.close)
+model_download_session = requests.Session()
+model_download_session.headers['User-Agent'] = 'Boomshakalaka-AI-Studio/1.0'
+
+# Content types for generated media served by the AI Studio endpoints
+MIME_TYPES = {
+    '.mp4': 'video/mp4',
+    '.webm': 'video/webm',
+    '.gif': 'image/gif',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+}
+
 # Twilio SMS/Voice Configuration
 TWILIO_ACCOUNT_SID = os.environ.get('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.environ.get('TWILIO_AUTH_TOKEN')
 TWILIO_PHONE_NUMBER = os.environ.get('TWILIO_PHONE_NUMBER', '+16122559398')
 
-# Initialize Twilio client
-twilio_client = None
-if TWILIO_AVAILABLE and TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN:
+
+@lru_cache(maxsize=1)
+def get_twilio_client():
+    """Return the Twilio REST client, creating it on first use (None if unavailable)."""
+    if not (TWILIO_AVAILABLE and TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN):
+        return None
     try:
-        twilio_client = TwilioClient(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+        from twilio.rest import Client as TwilioClient
+        client = TwilioClient(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
         print(f"Twilio client initialized for {TWILIO_PHONE_NUMBER}")
+        return client
     except Exception as e:
         print(f"Failed to initialize Twilio client: {e}")
+        return None
+
+
+def twiml_response():
+    """Empty TwiML MessagingResponse (imports twilio.twiml on first use)."""
+    from twilio.twiml.messaging_response import MessagingResponse
+    return MessagingResponse()
+
 
 # OpenClaw Gateway for AI responses
 OPENCLAW_GATEWAY_URL = 'http://192.168.0.168:18789'
@@ -298,9 +418,69 @@ LOG_FILES = {
     'Polymarket Scanner': POLYMARKET_DIR / 'scanner.log',
 }
 
+# How long parse_crontab() results are reused
+CRONTAB_TTL = 5.0
+
+# (monotonic time, jobs) from the last `crontab -l`
+_crontab_cache = {'entry': (0.0, None)}
+
+# Command substrings identifying known cron jobs, checked in order
+CRON_JOB_TAGS = (
+    (('garbage_time', 'cron_runner.sh'), 'Garbage Time Monitor', 'Sports'),
+    (('live_monitor.py analyze',), 'Daily Analysis Report', 'Sports'),
+    (('weekly_report',), 'Weekly Report', 'Sports'),
+    (('insider',), 'Insider Detector', 'Crypto'),
+    (('sports_replays',), 'Sports Replays', 'Sports'),
+    (('ingest', 'scanner'), 'Polymarket Scanner', 'Crypto'),
+)
+
+# How long check_api_health() results are reused
+API_HEALTH_TTL = 30.0
+
+# (monotonic time, health dict) from the last check_api_health() run
+_api_health_cache = {'entry': (0.0, None)}
+
+# Block size for reading log files backwards from the end
+LOG_READ_CHUNK = 8192
+
+# Log lines carrying a run timestamp, and the timestamp itself
+LOG_DATE_LINE_PATTERN = re.compile(rb'\[20[0-9]{2}-[0-9]{2}-[0-9]{2}')
+LOG_TIMESTAMP_PATTERN = re.compile(rb'\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]')
+
+# Log results are reused while the file is unchanged, for at most this long
+LOG_CACHE_TTL = 2.0
+# Entries older than this are evicted when new ones are stored
+LOG_CACHE_MAX_AGE = 60.0
+
+# (path, kind, mtime_ns, size) -> (monotonic time, result)
+_log_cache = {}
+_log_cache_lock = threading.Lock()
+
 
 def parse_crontab():
-    """Parse user crontab and return list of jobs"""
+    """Parse user crontab and return list of jobs
+
+    The result is reused for CRONTAB_TTL seconds, so page loads and stats
+    polling don't fork `crontab -l` every time. Callers must not modify it.
+    """
+    read_at, jobs = _crontab_cache['entry']
+    if jobs is not None and time.monotonic() - read_at < CRONTAB_TTL:
+        return jobs
+    jobs = read_crontab_jobs()
+    _crontab_cache['entry'] = (time.monotonic(), jobs)
+    return jobs
+
+
+def classify_cron_command(command):
+    """Return (job name, category) for a crontab command"""
+    for tags, job_name, category in CRON_JOB_TAGS:
+        if any(tag in command for tag in tags):
+            return job_name, category
+    return 'Unknown', 'Other'
+
+
+def read_crontab_jobs():
+    """Run `crontab -l` and parse it into a list of jobs"""
     try:
         result = subprocess.run(['crontab', '-l'], capture_output=True, text=True)
         if result.returncode != 0:
@@ -321,27 +501,7 @@ def parse_crontab():
                 schedule = ' '.join(parts[:5])
                 command = parts[5]
 
-                job_name = 'Unknown'
-                category = 'Other'
-
-                if 'garbage_time' in command or 'cron_runner.sh' in command:
-                    job_name = 'Garbage Time Monitor'
-                    category = 'Sports'
-                elif 'live_monitor.py analyze' in command:
-                    job_name = 'Daily Analysis Report'
-                    category = 'Sports'
-                elif 'weekly_report' in command:
-                    job_name = 'Weekly Report'
-                    category = 'Sports'
-                elif 'insider' in command:
-                    job_name = 'Insider Detector'
-                    category = 'Crypto'
-                elif 'sports_replays' in command:
-                    job_name = 'Sports Replays'
-                    category = 'Sports'
-                elif 'ingest' in command or 'scanner' in command:
-                    job_name = 'Polymarket Scanner'
-                    category = 'Crypto'
+                job_name, category = classify_cron_command(command)
 
                 jobs.append({
                     'name': job_name,
@@ -356,8 +516,12 @@ def parse_crontab():
         return [{'name': 'Error', 'schedule': '', 'command': str(e), 'human_schedule': '', 'category': 'Error'}]
 
 
+@lru_cache(maxsize=256)
 def humanize_cron(schedule):
-    """Convert cron expression to human-readable format"""
+    """Convert cron expression to human-readable format
+
+    Memoized: a crontab only has a handful of distinct schedules.
+    """
     parts = schedule.split()
     if len(parts) != 5:
         return schedule
@@ -389,30 +553,76 @@ def humanize_cron(schedule):
     return schedule
 
 
+def tail_log_bytes(log_path, lines):
+    """Return the last N lines of a file as bytes, like `tail -n`.
+
+    Reads backwards from the end in LOG_READ_CHUNK blocks until enough
+    newlines have been seen, so cost depends on N rather than file size.
+    """
+    with open(log_path, 'rb') as f:
+        offset = f.seek(0, os.SEEK_END)
+        buf = b''
+        while offset > 0:
+            step = min(LOG_READ_CHUNK, offset)
+            offset -= step
+            f.seek(offset)
+            buf = f.read(step) + buf
+            # A trailing newline terminates the last line, it doesn't start a new one
+            end = len(buf) - 1 if buf.endswith(b'\n') else len(buf)
+            if buf.count(b'\n', 0, end) >= lines:
+                break
+    end = len(buf) - 1 if buf.endswith(b'\n') else len(buf)
+    start = end
+    for _ in range(lines):
+        start = buf.rfind(b'\n', 0, start)
+        if start < 0:
+            break
+    return buf[start + 1:] if lines else b''
+
+
+def last_matching_log_line(log_path, pattern):
+    """Return the last line of a file matching a bytes regex, or None.
+
+    Scans backwards from the end of the file one block at a time.
+    """
+    with open(log_path, 'rb') as f:
+        offset = f.seek(0, os.SEEK_END)
+        partial = b''
+        while offset > 0:
+            step = min(LOG_READ_CHUNK, offset)
+            offset -= step
+            f.seek(offset)
+            block_lines = (f.read(step) + partial).split(b'\n')
+            # The first piece may continue in the previous block
+            partial = block_lines.pop(0) if offset > 0 else b''
+            for line in reversed(block_lines):
+                if pattern.search(line):
+                    return line
+    return None
+
+
 def read_log_tail(log_path, lines=50):
     """Read the last N lines of a log file"""
+    # Open directly rather than exists()-then-open; one stat fewer per call
     try:
-        if not log_path or not log_path.exists():
+        if not log_path:
             return f"Log file not found: {log_path}"
 
-        result = subprocess.run(['tail', '-n', str(lines), str(log_path)],
-                              capture_output=True, text=True)
-        return result.stdout or "Empty log file"
+        return tail_log_bytes(log_path, lines).decode('utf-8', 'replace') or "Empty log file"
+    except FileNotFoundError:
+        return f"Log file not found: {log_path}"
     except Exception as e:
         return f"Error reading log: {e}"
 
 
 def count_errors_in_log(log_path, hours=24):
-    """Count error occurrences in log file"""
+    """Count lines mentioning errors in log file (case-insensitive, like grep -ci)"""
     try:
-        if not log_path or not log_path.exists():
+        if not log_path:
             return 0
 
-        result = subprocess.run(
-            ['grep', '-c', '-i', 'error', str(log_path)],
-            capture_output=True, text=True
-        )
-        return int(result.stdout.strip()) if result.stdout.strip() else 0
+        with open(log_path, 'rb') as f:
+            return sum(1 for line in f if b'error' in line.lower())
     except:
         return 0
 
@@ -420,19 +630,14 @@ def count_errors_in_log(log_path, hours=24):
 def get_last_success_time(log_path):
     """Try to find the last successful run timestamp from log"""
     try:
-        if not log_path or not log_path.exists():
+        if not log_path:
             return None
 
-        result = subprocess.run(
-            ['grep', '-E', r'\[20[0-9]{2}-[0-9]{2}-[0-9]{2}', str(log_path)],
-            capture_output=True, text=True
-        )
-
-        lines = result.stdout.strip().split('\n')
-        if lines and lines[-1]:
-            match = re.search(r'\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]', lines[-1])
+        line = last_matching_log_line(log_path, LOG_DATE_LINE_PATTERN)
+        if line:
+            match = LOG_TIMESTAMP_PATTERN.search(line)
             if match:
-                return match.group(1)
+                return match.group(1).decode('ascii')
 
         mtime = datetime.fromtimestamp(log_path.stat().st_mtime)
         return mtime.strftime('%Y-%m-%d %H:%M:%S')
@@ -440,55 +645,108 @@ def get_last_success_time(log_path):
         return None
 
 
-def check_api_health():
-    """Check health of external APIs"""
-    health = {}
-
+def check_odds_api():
+    """Health entry for the Odds API"""
     try:
-        import httpx
-        api_key = os.getenv('ODDS_API_KEY')
-        response = httpx.get(
+        response = health_check_client.get(
             'https://api.the-odds-api.com/v4/sports/',
-            params={'apiKey': api_key},
-            timeout=10
+            params={'apiKey': os.getenv('ODDS_API_KEY')},
         )
-        health['odds_api'] = {
+        return {
             'status': 'healthy' if response.status_code == 200 else 'error',
             'code': response.status_code,
             'message': f'{len(response.json())} sports available' if response.status_code == 200 else response.text[:100]
         }
     except Exception as e:
-        health['odds_api'] = {'status': 'error', 'code': 0, 'message': str(e)}
+        return {'status': 'error', 'code': 0, 'message': str(e)}
+
 
+def check_polymarket_api():
+    """Health entry for the Polymarket markets API"""
     try:
-        import httpx
-        response = httpx.get(
+        response = health_check_client.get(
             'https://gamma-api.polymarket.com/markets',
             params={'closed': 'false', 'limit': 1},
-            timeout=10
         )
-        health['polymarket_api'] = {
+        return {
             'status': 'healthy' if response.status_code == 200 else 'error',
             'code': response.status_code,
             'message': 'Markets API accessible' if response.status_code == 200 else response.text[:100]
         }
     except Exception as e:
-        health['polymarket_api'] = {'status': 'error', 'code': 0, 'message': str(e)}
+        return {'status': 'error', 'code': 0, 'message': str(e)}
 
+
+def check_api_health():
+    """Check health of external APIs
+
+    Both APIs are checked concurrently, and the combined result is reused
+    for API_HEALTH_TTL seconds.
+    """
+    checked_at, health = _api_health_cache['entry']
+    if health is not None and time.monotonic() - checked_at < API_HEALTH_TTL:
+        return health
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        odds = executor.submit(check_odds_api)
+        polymarket = executor.submit(check_polymarket_api)
+        health = {
+            'odds_api': odds.result(),
+            'polymarket_api': polymarket.result(),
+        }
+
+    _api_health_cache['entry'] = (time.monotonic(), health)
     return health
 
 
+def cached_log_result(path, kind, compute):
+    """Return compute(path), reusing a recent result while the file is unchanged.
+
+    Results are keyed on the file's mtime and size plus `kind`, so dashboard
+    polling only costs a stat() until the log is written to.
+    """
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError):
+        # Missing or unconfigured log; the helpers report that themselves
+        return compute(path)
+
+    key = (os.fspath(path), kind, st.st_mtime_ns, st.st_size)
+    now = time.monotonic()
+    with _log_cache_lock:
+        hit = _log_cache.get(key)
+    if hit and now - hit[0] < LOG_CACHE_TTL:
+        return hit[1]
+
+    result = compute(path)
+    with _log_cache_lock:
+        for stale in [k for k, (ts, _) in _log_cache.items() if now - ts >= LOG_CACHE_MAX_AGE]:
+            del _log_cache[stale]
+        _log_cache[key] = (now, result)
+    return result
+
+
+def get_log_stats(path):
+    """Tail, error count and last run time for one monitored log"""
+    return {
+        'content': read_log_tail(path, 50),
+        'errors_24h': count_errors_in_log(path),
+        'last_run': get_last_success_time(path),
+        'path': str(path) if path else 'N/A',
+    }
+
+
+def cached_log_stats(path):
+    """get_log_stats() through the unchanged-file cache"""
+    return cached_log_result(path, 'stats', get_log_stats)
+
+
 def get_log_data():
     """Get log data for all monitored files"""
-    log_data = {}
-    for name, path in LOG_FILES.items():
-        log_data[name] = {
-            'content': read_log_tail(path, 50),
-            'errors_24h': count_errors_in_log(path),
-            'last_run': get_last_success_time(path),
-            'path': str(path) if path else 'N/A',
-        }
-    return log_data
+    # Read the files in parallel; map() keeps LOG_FILES order for display
+    with ThreadPoolExecutor(max_workers=min(8, len(LOG_FILES))) as executor:
+        stats = executor.map(cached_log_stats, LOG_FILES.values())
+        return dict(zip(LOG_FILES, stats))
 
 
 def get_common_context():
@@ -517,39 +775,107 @@ def get_common_context():
 GARBAGE_TIME_DB = POLYMARKET_DIR / 'sports_betting' / 'garbage_time.db'
 OPTIMIZATION_RESULTS = POLYMARKET_DIR / 'sports_betting' / 'optimization_results.json'
 
+# Profit per $1 staked on a win at -110 odds
+WIN_PAYOUT = 0.909
+# Win rate needed to break even at -110 odds (52.38%)
+BREAKEVEN_WIN_RATE = 0.5238
+
+# Shared connection to garbage_time.db (written by the garbage time monitor)
+_garbage_time_db = None
+garbage_time_db_lock = threading.Lock()
+
+# Completed blowout games, keyed on the DB and WAL files' (mtime_ns, size)
+_blowout_games_cache = {'entry': (None, None)}
+
+
+def get_garbage_time_db():
+    """Return the shared garbage_time.db connection, opening it on first use.
+
+    Callers must hold garbage_time_db_lock while using the connection.
+    """
+    global _garbage_time_db
+    if _garbage_time_db is None:
+        conn = sqlite3.connect(os.fspath(GARBAGE_TIME_DB), check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        conn.execute('PRAGMA cache_size=-32000')
+        try:
+            # WAL lets these reads run alongside the monitor's writes
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_games_completed_blowout '
+                'ON games(status, is_blowout, game_date)'
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("Could not tune garbage_time.db: %s", e)
+        _garbage_time_db = conn
+    return _garbage_time_db
+
+
+def garbage_time_db_version():
+    """(mtime_ns, size) of garbage_time.db and its WAL file, or None if missing.
+
+    In WAL mode new rows land in the -wal file until a checkpoint, so both
+    files are needed to notice a change.
+    """
+    db_path = os.fspath(GARBAGE_TIME_DB)
+    try:
+        st = os.stat(db_path)
+    except OSError:
+        return None
+    try:
+        wal = os.stat(db_path + '-wal')
+        wal_key = (wal.st_mtime_ns, wal.st_size)
+    except OSError:
+        wal_key = None
+    return (st.st_mtime_ns, st.st_size, wal_key)
+
 
 def get_completed_blowout_games():
-    """Get all completed blowout games from garbage_time.db"""
-    if not GARBAGE_TIME_DB.exists():
-        return []
+    """Get all completed blowout games from garbage_time.db, oldest first
 
-    conn = sqlite3.connect(str(GARBAGE_TIME_DB))
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    cursor.execute('''
-        SELECT
-            game_id,
-            sport,
-            home_team,
-            away_team,
-            game_date,
-            halftime_lead,
-            halftime_spread,
-            final_margin,
-            underdog_covered,
-            regression_amount
-        FROM games
-        WHERE status = 'completed'
-        AND is_blowout = 1
-        ORDER BY game_date ASC
-    ''')
+    The Kelly and running-profit calculators rely on this date order. The
+    list is cached until the database changes and shared between
+    callers, so it must not be modified.
+    """
+    version = garbage_time_db_version()
+    if version is None:
+        return []
+    cached_version, games = _blowout_games_cache['entry']
+    if cached_version == version:
+        return games
 
-    games = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    games = query_completed_blowout_games()
+    _blowout_games_cache['entry'] = (version, games)
     return games
 
 
+def query_completed_blowout_games():
+    """Read all completed blowout games from garbage_time.db"""
+    with garbage_time_db_lock:
+        cursor = get_garbage_time_db().execute('''
+            SELECT
+                game_id,
+                sport,
+                home_team,
+                away_team,
+                game_date,
+                halftime_lead,
+                halftime_spread,
+                final_margin,
+                underdog_covered,
+                regression_amount
+            FROM games
+            WHERE status = 'completed'
+            AND is_blowout = 1
+            ORDER BY game_date ASC
+        ''')
+        return [dict(row) for row in cursor.fetchall()]
+
+
 def load_optimization_results():
     """Load historical optimization results from JSON file"""
     if not OPTIMIZATION_RESULTS.exists():
@@ -559,6 +885,12 @@ def load_optimization_results():
         return json.load(f)
 
 
+def kelly_fraction(win_rate):
+    """Kelly stake (bp - q) / b at -110 odds, floored at zero"""
+    q = 1 - win_rate
+    return max(0, (WIN_PAYOUT * win_rate - q) / WIN_PAYOUT)
+
+
 def calculate_kelly_results(games, threshold, starting_bankroll=10000):
     """
     Calculate Kelly-based P&L for games at a given threshold.
@@ -591,18 +923,14 @@ def calculate_kelly_results(games, threshold, starting_bankroll=10000):
     wins = sum(1 for g in qualifying if g['underdog_covered'])
     win_rate = wins / len(qualifying)
 
-    # Kelly: (bp - q) / b where b=0.909 for -110 odds
-    b = 0.909  # profit multiplier at -110 odds
-    p = win_rate
-    q = 1 - p
-    kelly = max(0, (b * p - q) / b)
+    kelly = kelly_fraction(win_rate)
 
-    # Simulate betting each game chronologically
+    # Simulate betting each game chronologically (games come date-sorted)
     bankroll = starting_bankroll
-    for game in sorted(qualifying, key=lambda x: x['game_date'] or ''):
+    for game in qualifying:
         bet_size = bankroll * kelly
         if game['underdog_covered']:
-            bankroll += bet_size * 0.909  # Win at -110
+            bankroll += bet_size * WIN_PAYOUT  # Win at -110
         else:
             bankroll -= bet_size
 
@@ -627,19 +955,17 @@ def calculate_bankroll_series(games, threshold, starting_bankroll=10000):
     wins = sum(1 for g in qualifying if g['underdog_covered'])
     win_rate = wins / len(qualifying) if qualifying else 0
 
-    b = 0.909
-    p = win_rate
-    q = 1 - p
-    kelly = max(0, (b * p - q) / b)
+    kelly = kelly_fraction(win_rate)
 
     bankroll = starting_bankroll
     labels = ['Start']
     values = [starting_bankroll]
 
-    for game in sorted(qualifying, key=lambda x: x['game_date'] or ''):
+    # games come date-sorted from get_completed_blowout_games()
+    for game in qualifying:
         bet_size = bankroll * kelly
         if game['underdog_covered']:
-            bankroll += bet_size * 0.909
+            bankroll += bet_size * WIN_PAYOUT
         else:
             bankroll -= bet_size
 
@@ -649,13 +975,8 @@ def calculate_bankroll_series(games, threshold, starting_bankroll=10000):
     return {'labels': labels, 'values': values}
 
 
-def calculate_bucket_results(games, lower_bound, upper_bound):
-    """
-    Calculate results for a specific point bucket (e.g., 15-16pt leads).
-    This gives ROI per dollar wagered for that specific range.
-    """
-    BREAKEVEN = 0.5238  # 52.38% needed at -110 odds
-
+def summarize_bucket(lower_bound, upper_bound, games, wins):
+    """Build a bucket result row from its game and win counts."""
     if not games:
         return {
             'bucket': f'{lower_bound}-{upper_bound}pt',
@@ -669,26 +990,8 @@ def calculate_bucket_results(games, lower_bound, upper_bound):
             'recommendation': 'NO DATA'
         }
 
-    # Filter games in this specific bucket (inclusive lower, exclusive upper)
-    qualifying = [g for g in games
-                  if g['halftime_lead'] and lower_bound <= g['halftime_lead'] < upper_bound]
-
-    if not qualifying:
-        return {
-            'bucket': f'{lower_bound}-{upper_bound}pt',
-            'lower': lower_bound,
-            'upper': upper_bound,
-            'games': 0,
-            'wins': 0,
-            'win_rate': 0,
-            'edge': 0,
-            'ev_per_100': 0,
-            'recommendation': 'NO DATA'
-        }
-
-    wins = sum(1 for g in qualifying if g['underdog_covered'])
-    win_rate = wins / len(qualifying)
-    edge = (win_rate - BREAKEVEN) * 100
+    win_rate = wins / games
+    edge = (win_rate - BREAKEVEN_WIN_RATE) * 100
 
     # EV per $100 wagered: (win_rate * $90.91) - ((1-win_rate) * $100)
     ev_per_100 = (win_rate * 90.91) - ((1 - win_rate) * 100)
@@ -707,7 +1010,7 @@ def calculate_bucket_results(games, lower_bound, upper_bound):
         'bucket': f'{lower_bound}-{upper_bound}pt',
         'lower': lower_bound,
         'upper': upper_bound,
-        'games': len(qualifying),
+        'games': games,
         'wins': wins,
         'win_rate': win_rate,
         'edge': round(edge, 1),
@@ -716,16 +1019,35 @@ def calculate_bucket_results(games, lower_bound, upper_bound):
     }
 
 
+def calculate_bucket_results(games, lower_bound, upper_bound):
+    """
+    Calculate results for a specific point bucket (e.g., 15-16pt leads).
+    This gives ROI per dollar wagered for that specific range.
+    """
+    # Filter games in this specific bucket (inclusive lower, exclusive upper)
+    qualifying = [g for g in games
+                  if g['halftime_lead'] and lower_bound <= g['halftime_lead'] < upper_bound]
+    wins = sum(1 for g in qualifying if g['underdog_covered'])
+    return summarize_bucket(lower_bound, upper_bound, len(qualifying), wins)
+
+
 def get_bucket_distribution(games):
     """
     Get the full bucket distribution for bell curve visualization.
     Returns list of bucket results from 12-13pt through 24-25pt.
     """
-    buckets = []
-    for lower in range(12, 25):
-        bucket = calculate_bucket_results(games, lower, lower + 1)
-        buckets.append(bucket)
-    return buckets
+    # Tally all 1-point buckets in one pass over the games
+    counts = {lower: [0, 0] for lower in range(12, 25)}
+    for game in games:
+        lead = game['halftime_lead']
+        if not lead:
+            continue
+        tally = counts.get(math.floor(lead))
+        if tally is not None:
+            tally[0] += 1
+            if game['underdog_covered']:
+                tally[1] += 1
+    return [summarize_bucket(lower, lower + 1, n, wins) for lower, (n, wins) in counts.items()]
 
 
 def calculate_running_profit(games, lower_bound=15, upper_bound=17, bet_size=100):
@@ -747,15 +1069,13 @@ def calculate_running_profit(games, lower_bound=15, upper_bound=17, bet_size=100
             'games': []
         }
 
-    # Sort by date
-    sorted_games = sorted(qualifying, key=lambda x: x['game_date'] or '')
-
+    # games come date-sorted from get_completed_blowout_games()
     total_pnl = 0
     games_with_pnl = []
 
-    for game in sorted_games:
+    for game in qualifying:
         if game['underdog_covered']:
-            pnl = bet_size * 0.909  # Win at -110
+            pnl = bet_size * WIN_PAYOUT  # Win at -110
             result = 'WIN'
         else:
             pnl = -bet_size
@@ -784,9 +1104,61 @@ def calculate_running_profit(games, lower_bound=15, upper_bound=17, bet_size=100
     }
 
 
+# Thresholds for the cumulative Kelly matrix on the analysis page
+KELLY_MATRIX_THRESHOLDS = (14, 15, 16, 17, 18, 19, 20, 22, 25)
+
+# (games list, analysis) for the most recent get_completed_blowout_games() result
+_betting_analysis_cache = {'entry': (None, None)}
+
+
+def get_betting_analysis(games):
+    """Bucket distribution, 15-17pt running profit and Kelly matrix for games.
+
+    Computed once per games list: get_completed_blowout_games() hands out
+    the same list until the database changes, so page loads and chart
+    requests in between reuse these results. They must not be modified.
+    """
+    cached_games, analysis = _betting_analysis_cache['entry']
+    if cached_games is games:
+        return analysis
+
+    matrix = [calculate_kelly_results(games, t) for t in KELLY_MATRIX_THRESHOLDS]
+
+    # Add edge calculation (vs 52.38% breakeven at -110)
+    for row in matrix:
+        row['edge'] = round((row['win_rate'] - BREAKEVEN_WIN_RATE) * 100, 1)
+        row['profitable'] = row['win_rate'] > BREAKEVEN_WIN_RATE
+
+    analysis = {
+        'bucket_distribution': get_bucket_distribution(games),
+        'running_profit': calculate_running_profit(games, lower_bound=15, upper_bound=17, bet_size=100),
+        'matrix': matrix,
+    }
+    _betting_analysis_cache['entry'] = (games, analysis)
+    return analysis
+
 
 # YouTube Data API v3 key
 YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
+# Partial response: only the search fields fetch_team_videos_api reads
+YOUTUBE_SEARCH_FIELDS = 'items(id/videoId,snippet(title,publishedAt))'
+
+
+# Score like "2-2" or "10 – 3" (hyphen, en-dash or em-dash)
+SCORE_PATTERN = re.compile(r'\s*\d+\s*[-–—]\s*\d+\s*')
+SCORE_BETWEEN_WORDS_PATTERN = re.compile(r'(\w)\s*\d+\s*[-–—]\s*\d+\s*(\w)')
+HIGHLIGHTS_COLON_PATTERN = re.compile(r'(.*?[Hh]ighlights)\s*:\s*(.*)')
+
+# Result-indicative words after "Highlights:"; matched as substrings
+SPOILER_WORDS = ('win', 'won', 'lose', 'loss', 'beat', 'defeat', 'powers', 'clinch',
+                 'advance', 'eliminate', 'walk-off', 'walkoff', 'comeback', 'rally',
+                 'shutout', 'shut out', 'crush', 'rout', 'dominate', 'edge', 'top')
+SPOILER_WORDS_PATTERN = re.compile('|'.join(map(re.escape, SPOILER_WORDS)))
+
+WHITESPACE_RUN_PATTERN = re.compile(r'\s+')
+DOUBLE_PIPE_PATTERN = re.compile(r'\s*\|\s*\|\s*')
+LEADING_PIPE_PATTERN = re.compile(r'^\s*\|\s*')
+TRAILING_PIPE_PATTERN = re.compile(r'\s*\|\s*$')
 
 
 def strip_score_from_title(title: str, strip_spoiler_text: bool = False) -> str:
@@ -801,20 +1173,13 @@ def strip_score_from_title(title: str, strip_spoiler_text: bool = False) -> str:
 
     If strip_spoiler_text is True, also removes descriptive text that spoils results.
     """
-    # Pattern: digits, optional spaces, dash/hyphen, optional spaces, digits
-    # Also handles en-dash (–) and em-dash (—)
-    score_pattern = r'\s*\d+\s*[-–—]\s*\d+\s*'
-
     # Check if there's a score in the title
-    if re.search(score_pattern, title):
+    if SCORE_PATTERN.search(title):
         # Replace score with " vs " if it's between two words (team names)
-        # First, check if score is between words
-        between_words = r'(\w)\s*\d+\s*[-–—]\s*\d+\s*(\w)'
-        if re.search(between_words, title):
-            title = re.sub(between_words, r'\1 vs \2', title)
-        else:
+        title, replaced = SCORE_BETWEEN_WORDS_PATTERN.subn(r'\1 vs \2', title)
+        if not replaced:
             # Score is at end or followed by separator, just remove it
-            title = re.sub(score_pattern, ' ', title)
+            title = SCORE_PATTERN.sub(' ', title)
 
     if strip_spoiler_text:
         # Strip spoiler text after pipe
@@ -823,26 +1188,21 @@ def strip_score_from_title(title: str, strip_spoiler_text: bool = False) -> str:
 
         # Strip spoiler text after "Highlights:" if it contains result-indicative words
         # Pattern: "Game Highlights: [spoiler text]" or "Highlights: [spoiler text]"
-        spoiler_words = ['win', 'won', 'lose', 'loss', 'beat', 'defeat', 'powers', 'clinch',
-                         'advance', 'eliminate', 'walk-off', 'walkoff', 'comeback', 'rally',
-                         'shutout', 'shut out', 'crush', 'rout', 'dominate', 'edge', 'top']
-
-        # Check if there's a colon after "Highlights" and spoiler words follow
-        highlights_match = re.search(r'(.*?[Hh]ighlights)\s*:\s*(.*)', title)
+        highlights_match = HIGHLIGHTS_COLON_PATTERN.search(title)
         if highlights_match:
             before_colon = highlights_match.group(1)
             after_colon = highlights_match.group(2).lower()
 
             # Check if the text after colon contains spoiler words
-            has_spoiler = any(word in after_colon for word in spoiler_words)
-            if has_spoiler:
+            if SPOILER_WORDS_PATTERN.search(after_colon):
                 title = before_colon
 
     # Clean up any double spaces or awkward separators
-    title = re.sub(r'\s+', ' ', title)  # Multiple spaces to single
-    title = re.sub(r'\s*\|\s*\|\s*', ' | ', title)  # Double pipes
-    title = re.sub(r'^\s*\|\s*', '', title)  # Leading pipe
-    title = re.sub(r'\s*\|\s*$', '', title)  # Trailing pipe
+    title = WHITESPACE_RUN_PATTERN.sub(' ', title)  # Multiple spaces to single
+    if '|' in title:
+        title = DOUBLE_PIPE_PATTERN.sub(' | ', title)  # Double pipes
+        title = LEADING_PIPE_PATTERN.sub('', title)  # Leading pipe
+        title = TRAILING_PIPE_PATTERN.sub('', title)  # Trailing pipe
 
     return title.strip()
 
@@ -889,8 +1249,6 @@ TEAM_CONFIGS = {
 
 def fetch_team_videos_api(team_name: str, config: dict, max_videos: int = 10) -> list:
     """Fetch videos using YouTube Data API v3 search."""
-    import requests
-
     videos = []
     try:
         params = {
@@ -899,6 +1257,7 @@ def fetch_team_videos_api(team_name: str, config: dict, max_videos: int = 10) ->
             'type': 'video',
             'maxResults': max_videos * 3,  # Fetch extra to filter
             'order': 'date',
+            'fields': YOUTUBE_SEARCH_FIELDS,
             'key': YOUTUBE_API_KEY,
         }
 
@@ -906,19 +1265,16 @@ def fetch_team_videos_api(team_name: str, config: dict, max_videos: int = 10) ->
         if 'channel_id' in config:
             params['channelId'] = config['channel_id']
 
-        response = requests.get(
-            'https://www.googleapis.com/youtube/v3/search',
-            params=params,
-            timeout=10
-        )
+        response = youtube_client.get('/search', params=params)
 
         if response.status_code == 200:
-            data = response.json()
+            data = fast_json_loads(response.content)
             title_filter = config.get('title_filter', '').lower()
             title_must_contain = config.get('title_must_contain', '')
-            title_exclude = config.get('title_exclude', [])
+            exclude_terms = tuple(term.lower() for term in config.get('title_exclude', []))
             strip_spoiler = config.get('strip_spoiler_text', False)
-            use_logo = config.get('use_logo', False)
+            # Same thumbnail for every video when the team logo replaces YouTube's
+            logo = TEAM_LOGOS.get(team_name) if config.get('use_logo', False) else None
 
             for item in data.get('items', []):
                 snippet = item.get('snippet', {})
@@ -928,9 +1284,10 @@ def fetch_team_videos_api(team_name: str, config: dict, max_videos: int = 10) ->
                     continue
 
                 title = snippet.get('title', '')
+                title_lc = title.lower()
 
                 # Apply title filter if specified (e.g., must contain "Wild")
-                if title_filter and title_filter not in title.lower():
+                if title_filter and title_filter not in title_lc:
                     continue
 
                 # Must contain filter (case-sensitive, e.g., "HIGHLIGHTS")
@@ -938,14 +1295,8 @@ def fetch_team_videos_api(team_name: str, config: dict, max_videos: int = 10) ->
                     continue
 
                 # Exclude filter (e.g., exclude "Timbers2")
-                if title_exclude:
-                    skip = False
-                    for exclude_term in title_exclude:
-                        if exclude_term.lower() in title.lower():
-                            skip = True
-                            break
-                    if skip:
-                        continue
+                if exclude_terms and any(term in title_lc for term in exclude_terms):
+                    continue
 
                 # Strip score spoilers from title
                 display_title = strip_score_from_title(title, strip_spoiler_text=strip_spoiler)
@@ -953,17 +1304,14 @@ def fetch_team_videos_api(team_name: str, config: dict, max_videos: int = 10) ->
                 published = snippet.get('publishedAt', '')[:10]
 
                 # Use team logo or YouTube thumbnail
-                if use_logo and team_name in TEAM_LOGOS:
-                    thumbnail = TEAM_LOGOS[team_name]
-                else:
-                    thumbnail = f"https://i.ytimg.com/vi/{video_id}/mqdefault.jpg"
+                thumbnail = logo or f"https://i.ytimg.com/vi/{video_id}/mqdefault.jpg"
 
                 videos.append({
                     'title': display_title,
                     'video_id': video_id,
                     'link': f"https://www.youtube.com/watch?v={video_id}",
                     'published': published,
-                    'is_highlight': 'highlight' in title.lower() or 'HIGHLIGHTS' in title,
+                    'is_highlight': 'highlight' in title_lc,
                     'thumbnail': thumbnail,
                 })
 
@@ -978,22 +1326,59 @@ def fetch_team_videos_api(team_name: str, config: dict, max_videos: int = 10) ->
     return videos
 
 
-def fetch_team_videos_rss(team_name: str, config: dict, max_videos: int = 10) -> list:
-    """Fetch videos using YouTube RSS feed."""
+# rss_url -> (ETag, Last-Modified, parsed feed) from the last 200 response
+_feed_cache = {}
+
+
+def fetch_feed(rss_url: str):
+    """Download and parse an RSS feed, revalidating with ETag/Last-Modified.
+
+    Channel feeds rarely change between polls; a 304 reuses the feed parsed
+    last time without transferring or parsing the XML again. Servers that
+    ignore the validators still skip the parse when the body is unchanged.
+    """
     import feedparser
 
+    cached = _feed_cache.get(rss_url)
+    headers = {}
+    if cached:
+        etag, last_modified, _, _ = cached
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+    response = feed_client.get(rss_url, headers=headers)
+    if response.status_code == 304 and cached:
+        return cached[3]
+
+    body = response.content
+    if response.status_code == 200 and cached and cached[2] == body:
+        feed = cached[3]
+    else:
+        feed = feedparser.parse(body, response_headers=dict(response.headers))
+    if response.status_code == 200:
+        _feed_cache[rss_url] = (response.headers.get('ETag'), response.headers.get('Last-Modified'), body, feed)
+    return feed
+
+
+def fetch_team_videos_rss(team_name: str, config: dict, max_videos: int = 10) -> list:
+    """Fetch videos using YouTube RSS feed."""
     videos = []
     strip_spoiler = config.get('strip_spoiler_text', False)
-    use_logo = config.get('use_logo', False)
+    # Same thumbnail for every video when the team logo replaces YouTube's
+    logo = TEAM_LOGOS[team_name] if config.get('use_logo', False) and team_name in TEAM_LOGOS else None
 
     try:
+        title_filter = config['filter'].lower() if 'filter' in config else None
+
         # Build RSS URL
         if 'rss_url' in config:
             rss_url = config['rss_url']
         else:
             rss_url = f"https://www.youtube.com/feeds/videos.xml?channel_id={config['channel_id']}"
 
-        feed = feedparser.parse(rss_url)
+        feed = fetch_feed(rss_url)
 
         for entry in feed.entries[:50]:
             video_id = entry.get('yt_videoid')
@@ -1006,15 +1391,15 @@ def fetch_team_videos_rss(team_name: str, config: dict, max_videos: int = 10) ->
                 continue
 
             title = entry.get('title', '')
+            title_lc = title.lower()
 
             # Only show highlight videos (must have "highlight" in title)
-            if 'highlight' not in title.lower():
+            if 'highlight' not in title_lc:
                 continue
 
             # Apply additional filter for shared channels (like NHL)
-            if 'filter' in config:
-                if config['filter'].lower() not in title.lower():
-                    continue
+            if title_filter is not None and title_filter not in title_lc:
+                continue
 
             # Strip score spoilers from title
             display_title = strip_score_from_title(title, strip_spoiler_text=strip_spoiler)
@@ -1023,8 +1408,8 @@ def fetch_team_videos_rss(team_name: str, config: dict, max_videos: int = 10) ->
             published = entry.get('published', '')
 
             # Use team logo or YouTube thumbnail
-            if use_logo and team_name in TEAM_LOGOS:
-                thumbnail = TEAM_LOGOS[team_name]
+            if logo is not None:
+                thumbnail = logo
             else:
                 thumbnail = f"https://i.ytimg.com/vi/{video_id}/mqdefault.jpg"
 
@@ -1033,7 +1418,7 @@ def fetch_team_videos_rss(team_name: str, config: dict, max_videos: int = 10) ->
                 'video_id': video_id,
                 'link': f"https://www.youtube.com/watch?v={video_id}",
                 'published': published[:10] if published else '',
-                'is_highlight': 'highlight' in title.lower(),
+                'is_highlight': True,  # non-highlights were skipped above
                 'thumbnail': thumbnail,
             })
 
@@ -1046,32 +1431,68 @@ def fetch_team_videos_rss(team_name: str, config: dict, max_videos: int = 10) ->
     return videos
 
 
+# How long fetched team videos are reused; highlights change on the scale of hours
+TEAM_VIDEOS_TTL = 600.0
+
+# (team, max_videos) -> (monotonic time, videos)
+_team_videos_cache = {}
+_team_videos_cache_lock = threading.Lock()
+
+
+def invalidate_team_cache(team_name: str = None):
+    """Drop cached videos for one team, or for all teams when no name is given."""
+    with _team_videos_cache_lock:
+        if team_name is None:
+            _team_videos_cache.clear()
+        else:
+            for key in [k for k in _team_videos_cache if k[0] == team_name]:
+                del _team_videos_cache[key]
+
+
 def fetch_team_videos(team_name: str, max_videos: int = 10) -> list:
-    """Fetch recent highlight videos for a team."""
+    """Fetch recent highlight videos for a team.
+
+    Results are reused for TEAM_VIDEOS_TTL seconds and shared between
+    callers, so they must not be modified.
+    """
     if team_name not in TEAM_CONFIGS:
         return []
 
+    key = (team_name, max_videos)
+    with _team_videos_cache_lock:
+        hit = _team_videos_cache.get(key)
+    if hit and time.monotonic() - hit[0] < TEAM_VIDEOS_TTL:
+        return hit[1]
+
     config = TEAM_CONFIGS[team_name]
     method = config.get('method', 'rss')
 
     if method == 'api_search':
-        return fetch_team_videos_api(team_name, config, max_videos)
+        videos = fetch_team_videos_api(team_name, config, max_videos)
     else:
-        return fetch_team_videos_rss(team_name, config, max_videos)
+        videos = fetch_team_videos_rss(team_name, config, max_videos)
+
+    # An empty list usually means the fetch failed; retry next time
+    if videos:
+        with _team_videos_cache_lock:
+            _team_videos_cache[key] = (time.monotonic(), videos)
+    return videos
 
 
 def get_all_team_videos() -> dict:
     """Fetch recent videos for all tracked teams."""
-    results = {}
-
-    for team, config in TEAM_CONFIGS.items():
-        results[team] = {
-            'videos': fetch_team_videos(team, max_videos=5),
-            'league': config.get('league', ''),
+    # Each team is an independent network fetch; run them side by side.
+    # map() keeps TEAM_CONFIGS order for display.
+    with ThreadPoolExecutor(max_workers=min(16, len(TEAM_CONFIGS))) as executor:
+        team_videos = executor.map(lambda team: fetch_team_videos(team, max_videos=5), TEAM_CONFIGS)
+        return {
+            team: {
+                'videos': videos,
+                'league': config.get('league', ''),
+            }
+            for (team, config), videos in zip(TEAM_CONFIGS.items(), team_videos)
         }
 
-    return results
-
 
 # ============================================
 # AI Studio Helper Functions
@@ -1079,8 +1500,6 @@ def get_all_team_videos() -> dict:
 
 def check_comfy_status() -> dict:
     """Check if ComfyUI is running and responsive."""
-    import socket
-
     status = {
         'running': False,
         'message': 'Not running',
@@ -1088,69 +1507,103 @@ def check_comfy_status() -> dict:
     }
 
     try:
-        # Quick socket check first
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(2)
-        result = sock.connect_ex((COMFY_HOST, COMFY_PORT))
-        sock.close()
-
-        if result == 0:
-            # Port is open, try to get system stats
-            import httpx
-            response = httpx.get(
-                f'http://{COMFY_HOST}:{COMFY_PORT}/system_stats',
-                timeout=5
-            )
-            if response.status_code == 200:
-                data = response.json()
-                vram = data.get('devices', [{}])[0]
-                vram_used = vram.get('vram_used', 0) / (1024**3)
-                vram_total = vram.get('vram_total', 0) / (1024**3)
-                status['running'] = True
-                status['message'] = f'Running - VRAM: {vram_used:.1f}/{vram_total:.1f} GB'
-                status['vram_used'] = vram_used
-                status['vram_total'] = vram_total
-        else:
-            status['message'] = 'ComfyUI not running. Start it to generate images.'
+        # A refused or timed-out connect means ComfyUI isn't up; no separate port probe
+        response = comfy_client.get('/system_stats', timeout=httpx.Timeout(5, connect=2))
+        if response.status_code == 200:
+            data = response.json()
+            vram = data.get('devices', [{}])[0]
+            vram_used = vram.get('vram_used', 0) / (1024**3)
+            vram_total = vram.get('vram_total', 0) / (1024**3)
+            status['running'] = True
+            status['message'] = f'Running - VRAM: {vram_used:.1f}/{vram_total:.1f} GB'
+            status['vram_used'] = vram_used
+            status['vram_total'] = vram_total
+    except (httpx.ConnectError, httpx.ConnectTimeout):
+        status['message'] = 'ComfyUI not running. Start it to generate images.'
     except Exception as e:
         status['message'] = f'Connection error: {str(e)[:50]}'
 
     return status
 
 
+# Model listings are reused while their directories' mtimes are unchanged,
+# for at most this long (in-place downloads grow files without touching the
+# directory mtime, so sizes still refresh)
+MODEL_LIST_TTL = 30.0
+
+# listing name -> (directory mtimes, monotonic time, result)
+_model_list_cache = {}
+
+
+def cached_model_listing(name: str, directories: tuple, scan):
+    """Return scan(), reusing the last result while the directories are unchanged.
+
+    Results are shared between callers and must not be modified.
+    """
+    mtimes = []
+    for directory in directories:
+        try:
+            mtimes.append(os.stat(directory).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    mtimes = tuple(mtimes)
+
+    now = time.monotonic()
+    hit = _model_list_cache.get(name)
+    if hit and hit[0] == mtimes and now - hit[1] < MODEL_LIST_TTL:
+        return hit[2]
+
+    result = scan()
+    _model_list_cache[name] = (mtimes, now, result)
+    return result
+
+
 def get_available_models() -> list:
     """Get list of available checkpoint models from ComfyUI models directory."""
+    return cached_model_listing('checkpoints', (MODELS_DIR / 'checkpoints',), scan_available_models)
+
+
+def scan_available_models() -> list:
+    """List checkpoint models by walking the checkpoints directory."""
     models = []
     checkpoints_dir = MODELS_DIR / 'checkpoints'
 
-    if checkpoints_dir.exists():
-        for f in checkpoints_dir.iterdir():
-            if f.is_file() and f.suffix.lower() in ['.safetensors', '.ckpt']:
-                stat = f.stat()
+    # DirEntry caches the file type from the directory read, so only the
+    # matching files cost a stat() call
+    try:
+        with os.scandir(checkpoints_dir) as entries:
+            for entry in entries:
+                stem, ext = os.path.splitext(entry.name)
+                if ext.lower() not in ('.safetensors', '.ckpt') or not entry.is_file():
+                    continue
+                stat = entry.stat()
                 size_gb = stat.st_size / (1024**3)
                 # Use modification time as "installed" date
                 installed_date = datetime.fromtimestamp(stat.st_mtime)
 
                 # Determine model type from name/size
+                name_lc = entry.name.lower()
                 model_type = 'Unknown'
-                if 'flux' in f.name.lower():
+                if 'flux' in name_lc:
                     model_type = 'Flux'
-                elif 'xl' in f.name.lower() or size_gb > 6:
+                elif 'xl' in name_lc or size_gb > 6:
                     model_type = 'SDXL'
-                elif 'sd3' in f.name.lower():
+                elif 'sd3' in name_lc:
                     model_type = 'SD3'
                 elif size_gb < 5:
                     model_type = 'SD 1.5'
 
                 models.append({
-                    'name': f.stem,  # Filename without extension
-                    'filename': f.name,
+                    'name': stem,  # Filename without extension
+                    'filename': entry.name,
                     'size_gb': round(size_gb, 1),
                     'type': model_type,
-                    'path': str(f),
+                    'path': entry.path,
                     'installed': installed_date.strftime('%Y-%m-%d'),
                     'installed_timestamp': stat.st_mtime,
                 })
+    except FileNotFoundError:
+        pass
 
     # Sort by type, then name
     models.sort(key=lambda x: (x['type'], x['name']))
@@ -1159,6 +1612,16 @@ def get_available_models() -> list:
 
 def get_available_video_models() -> list:
     """Get list of available video models from ComfyUI models directories."""
+    directories = (
+        MODELS_DIR / 'checkpoints',
+        MODELS_DIR / 'diffusion_models',
+        MODELS_DIR / 'diffusion_models' / 'TI2V',
+    )
+    return cached_model_listing('video', directories, scan_available_video_models)
+
+
+def scan_available_video_models() -> list:
+    """Check which known video models are present on disk."""
     video_models = []
 
     # Known video model locations and their info
@@ -1197,21 +1660,23 @@ def get_available_video_models() -> list:
     }
 
     for filename, info in video_model_info.items():
-        model_path = MODELS_DIR / info['dir'] / filename
-        if model_path.exists():
-            stat = model_path.stat()
-            size_gb = stat.st_size / (1024**3)
-            installed_date = datetime.fromtimestamp(stat.st_mtime)
-
-            video_models.append({
-                'name': info['name'],
-                'filename': filename,
-                'size_gb': round(size_gb, 1),
-                'type': info['type'],
-                'vram_gb': info['vram_gb'],
-                'recommended': info['recommended'],
-                'installed': installed_date.strftime('%Y-%m-%d'),
-            })
+        try:
+            stat = os.stat(MODELS_DIR / info['dir'] / filename)
+        except FileNotFoundError:
+            continue
+
+        size_gb = stat.st_size / (1024**3)
+        installed_date = datetime.fromtimestamp(stat.st_mtime)
+
+        video_models.append({
+            'name': info['name'],
+            'filename': filename,
+            'size_gb': round(size_gb, 1),
+            'type': info['type'],
+            'vram_gb': info['vram_gb'],
+            'recommended': info['recommended'],
+            'installed': installed_date.strftime('%Y-%m-%d'),
+        })
 
     # Sort: recommended first, then by VRAM (lower first)
     video_models.sort(key=lambda x: (not x['recommended'], x['vram_gb']))
@@ -1220,24 +1685,34 @@ def get_available_video_models() -> list:
 
 def get_available_loras() -> list:
     """Get list of available LoRA models."""
+    return cached_model_listing('loras', (MODELS_DIR / 'loras',), scan_available_loras)
+
+
+def scan_available_loras() -> list:
+    """List LoRA models by walking the loras directory."""
     loras = []
     loras_dir = MODELS_DIR / 'loras'
 
-    if loras_dir.exists():
-        for f in loras_dir.iterdir():
-            if f.is_file() and f.suffix.lower() in ['.safetensors', '.ckpt', '.pt']:
-                stat = f.stat()
+    try:
+        with os.scandir(loras_dir) as entries:
+            for entry in entries:
+                stem, ext = os.path.splitext(entry.name)
+                if ext.lower() not in ('.safetensors', '.ckpt', '.pt') or not entry.is_file():
+                    continue
+                stat = entry.stat()
                 size_mb = stat.st_size / (1024**2)
                 installed_date = datetime.fromtimestamp(stat.st_mtime)
 
                 loras.append({
-                    'name': f.stem,
-                    'filename': f.name,
+                    'name': stem,
+                    'filename': entry.name,
                     'size_mb': round(size_mb, 1),
-                    'path': str(f),
+                    'path': entry.path,
                     'installed': installed_date.strftime('%Y-%m-%d'),
                     'installed_timestamp': stat.st_mtime,
                 })
+    except FileNotFoundError:
+        pass
 
     loras.sort(key=lambda x: x['name'].lower())
     return loras
@@ -1449,61 +1924,70 @@ VIDEO_MODEL_TIPS = {
 }
 
 
+# MODEL_TIPS keys lowercased once, in match order
+MODEL_TIPS_LOWER = tuple((key.lower(), tips) for key, tips in MODEL_TIPS.items())
+
+# Default tips for unknown models
+DEFAULT_MODEL_TIPS = {
+    'type': 'Unknown',
+    'best_cfg': '5-8',
+    'best_steps': '20-30',
+    'best_size': '1024x1024',
+    'sampler': 'Euler or DPM++ 2M',
+    'tips': ['No specific tips available for this model'],
+    'recommended_negative': 'ugly, blurry, low quality',
+    'trigger_words': None,
+}
+
+
 def get_model_tips(model_filename: str) -> dict:
-    """Get tips for a specific model based on filename matching."""
+    """Get tips for a specific model based on filename matching.
+
+    The returned dict is shared and must not be modified.
+    """
     model_lower = model_filename.lower()
 
-    for key, tips in MODEL_TIPS.items():
-        if key.lower() in model_lower:
+    for key_lower, tips in MODEL_TIPS_LOWER:
+        if key_lower in model_lower:
             return tips
 
-    # Default tips for unknown models
-    return {
-        'type': 'Unknown',
-        'best_cfg': '5-8',
-        'best_steps': '20-30',
-        'best_size': '1024x1024',
-        'sampler': 'Euler or DPM++ 2M',
-        'tips': ['No specific tips available for this model'],
-        'recommended_negative': 'ugly, blurry, low quality',
-        'trigger_words': None,
-    }
+    return DEFAULT_MODEL_TIPS
 
 
 def get_generation_count() -> int:
     """Get total number of generations from database."""
-    db_path = DATABASES_DIR / 'generations.db'
-    if not db_path.exists():
+    db_path = GENERATIONS_DB_PATH_STR
+    if not os.path.exists(db_path):
         return 0
 
     try:
-        import sqlite3
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.execute('SELECT COUNT(*) FROM generations')
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        with generations_db_lock:
+            return get_generations_db().execute('SELECT COUNT(*) FROM generations').fetchone()[0]
     except:
         return 0
 
 
-def get_recent_generations(limit: int = 50) -> list:
+# Columns the saved generations page renders; skipping workflow_json keeps
+# the large workflow blobs out of every listing
+RECENT_GENERATION_COLUMNS = (
+    'id, created_at, prompt, model, seed, steps, cfg_scale, sampler, '
+    'width, height, favorite, output_path, thumbnail_path'
+)
+
+
+def get_recent_generations(limit: int = 50) -> list:
     """Get recent generations from database."""
-    db_path = DATABASES_DIR / 'generations.db'
-    if not db_path.exists():
+    db_path = GENERATIONS_DB_PATH_STR
+    if not os.path.exists(db_path):
         return []
 
     try:
-        import sqlite3
-        conn = sqlite3.connect(str(db_path))
-        conn.row_factory = sqlite3.Row
-        cursor = conn.execute('''
-            SELECT * FROM generations
-            ORDER BY created_at DESC
-            LIMIT ?
-        ''', (limit,))
-        rows = cursor.fetchall()
-        conn.close()
+        with generations_db_lock:
+            rows = get_generations_db().execute(f'''
+                SELECT {RECENT_GENERATION_COLUMNS} FROM generations
+                ORDER BY created_at DESC
+                LIMIT ?
+            ''', (limit,)).fetchall()
         return [dict(row) for row in rows]
     except:
         return []
@@ -1511,11 +1995,10 @@ def get_recent_generations(limit: int = 50) -> list:
 
 def init_generations_db():
     """Initialize the generations database if it doesn't exist."""
-    db_path = DATABASES_DIR / 'generations.db'
+    db_path = GENERATIONS_DB_PATH_STR
     DATABASES_DIR.mkdir(parents=True, exist_ok=True)
 
-    import sqlite3
-    conn = sqlite3.connect(str(db_path))
+    conn = sqlite3.connect(db_path)
     conn.execute('''
         CREATE TABLE IF NOT EXISTS generations (
             id TEXT PRIMARY KEY,
@@ -1624,12 +2107,37 @@ def init_generations_db():
     ''')
 
     conn.execute('CREATE INDEX IF NOT EXISTS idx_segment_sequence ON video_segments(sequence_id, segment_order)')
+    # Covers the per-sequence SUM(duration) in add_segment without touching table rows
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_segment_duration ON video_segments(sequence_id, duration)')
     conn.execute('CREATE INDEX IF NOT EXISTS idx_segment_status ON video_segments(status)')
 
     conn.commit()
     conn.close()
 
 
+# Shared generations.db connection. The dev server runs each request on a
+# fresh thread, so one lock-guarded connection is reused instead of one per thread.
+_generations_db = None
+generations_db_lock = threading.RLock()
+
+
+def get_generations_db():
+    """Return the shared generations.db connection, opening it on first use.
+
+    Callers must hold generations_db_lock while using the connection.
+    """
+    global _generations_db
+    if _generations_db is None:
+        conn = sqlite3.connect(GENERATIONS_DB_PATH_STR, check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        _generations_db = conn
+    return _generations_db
+
+
 # Initialize database on module load
 try:
     init_generations_db()
@@ -1728,27 +2236,18 @@ def sports_betting_analysis():
     """Garbage Time Analysis page with ROI-focused bucket analysis"""
     games = get_completed_blowout_games()
     historical = load_optimization_results()
+    analysis = get_betting_analysis(games)
 
     # === ROI-Focused Bucket Analysis (NEW) ===
-    # Get bucket distribution for bell curve chart
-    bucket_distribution = get_bucket_distribution(games)
-
-    # Calculate running profit for optimal range (15-17pt)
-    running_profit = calculate_running_profit(games, lower_bound=15, upper_bound=17, bet_size=100)
+    bucket_distribution = analysis['bucket_distribution']
+    running_profit = analysis['running_profit']
 
     # Find optimal bucket (highest EV per $100)
     profitable_buckets = [b for b in bucket_distribution if b['ev_per_100'] > 0]
     optimal_bucket = max(profitable_buckets, key=lambda x: x['ev_per_100']) if profitable_buckets else None
 
     # === Legacy Cumulative Threshold Analysis ===
-    thresholds = [14, 15, 16, 17, 18, 19, 20, 22, 25]
-    matrix = [calculate_kelly_results(games, t) for t in thresholds]
-
-    # Add edge calculation (vs 52.38% breakeven at -110)
-    BREAKEVEN = 0.5238
-    for row in matrix:
-        row['edge'] = round((row['win_rate'] - BREAKEVEN) * 100, 1)
-        row['profitable'] = row['win_rate'] > BREAKEVEN
+    matrix = analysis['matrix']
 
     # Find best threshold by final bankroll
     best = max(matrix, key=lambda x: x['final_bankroll']) if matrix else None
@@ -1808,8 +2307,7 @@ def api_betting_chart():
 @app.route('/api/betting/analysis/buckets')
 def api_betting_buckets():
     """JSON endpoint for bucket distribution chart data"""
-    games = get_completed_blowout_games()
-    buckets = get_bucket_distribution(games)
+    buckets = get_betting_analysis(get_completed_blowout_games())['bucket_distribution']
 
     # Format for Chart.js
     return jsonify({
@@ -1913,14 +2411,15 @@ def ai_generate():
 def ai_video():
     """Video Studio - dedicated video generation and stitching interface"""
     comfy_status = check_comfy_status()
-    video_models = get_available_video_models()
-
-    # Add display names and types for the UI
-    for model in video_models:
+    # Copies with display names and types for the UI; the cached listing is shared
+    video_models = []
+    for cached_model in get_available_video_models():
+        model = dict(cached_model)
         model_type = get_model_type(model['filename']) if VIDEO_PARAMS_AVAILABLE else 'ltx'
         model['type'] = model_type
         model_params = VIDEO_MODEL_PARAMS.get(model_type, {}) if VIDEO_PARAMS_AVAILABLE else {}
         model['display_name'] = model_params.get('display_name', model['filename'])
+        video_models.append(model)
 
     return render_template('ai_video.html',
                          active_page='ai_video',
@@ -2296,12 +2795,28 @@ def api_logs(name):
         if name.lower() in log_name.lower():
             return jsonify({
                 'name': log_name,
-                'content': read_log_tail(path, 100),
-                'errors_24h': count_errors_in_log(path),
+                'content': cached_log_result(path, 'tail100', lambda p: read_log_tail(p, 100)),
+                'errors_24h': cached_log_result(path, 'errors', count_errors_in_log),
             })
     return jsonify({'error': 'Log not found'}), 404
 
 
+@app.route('/api/logs/stream')
+def api_logs_stream():
+    """Stream log data for all monitored files as NDJSON, one log per line
+
+    Each line is {name: stats} and is sent as soon as that file has been
+    read, so the first log arrives without waiting for the slowest one.
+    """
+    def generate():
+        with ThreadPoolExecutor(max_workers=min(8, len(LOG_FILES))) as executor:
+            futures = {executor.submit(cached_log_stats, path): name for name, path in LOG_FILES.items()}
+            for future in as_completed(futures):
+                yield fast_json_dumps({futures[future]: future.result()}) + b'\n'
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+
 @app.route('/api/cron')
 def api_cron():
     """Get cron job list"""
@@ -2448,7 +2963,7 @@ def api_reggie_system_status():
             return ('voice', False)
 
     def get_sms_info():
-        sms_online = twilio_client is not None
+        sms_online = get_twilio_client() is not None
         phone = TWILIO_PHONE_NUMBER if sms_online else None
         recent = []
         if PROJECTS_AVAILABLE:
@@ -2994,7 +3509,6 @@ def reggie_camera_signaling_proxy(ws):
     calls must happen in a single thread. We use a Queue to pass messages from
     the background thread (robot->client) to the main thread which does all ws operations.
     """
-    import time
     connect_start = time.time()
     msg_count = {'robot_to_browser': 0, 'browser_to_robot': 0}
 
@@ -3272,12 +3786,17 @@ def reggie_state_ws_proxy(ws):
 
 @app.route('/api/team-videos/<team>')
 def api_team_videos(team):
-    """Get recent videos for a specific team"""
+    """Get recent videos for a specific team
+
+    ?refresh=1 skips the TEAM_VIDEOS_TTL cache and fetches fresh videos.
+    """
     # URL decode the team name
     team_name = team.replace('-', ' ').title()
     if team_name == 'Liverpool Fc':
         team_name = 'Liverpool FC'
 
+    if request.args.get('refresh', '').lower() in ('1', 'true'):
+        invalidate_team_cache(team_name)
     videos = fetch_team_videos(team_name, max_videos=10)
     return jsonify({
         'team': team_name,
@@ -3287,7 +3806,12 @@ def api_team_videos(team):
 
 @app.route('/api/all-team-videos')
 def api_all_team_videos():
-    """Get recent videos for all teams"""
+    """Get recent videos for all teams
+
+    ?refresh=1 skips the TEAM_VIDEOS_TTL cache and fetches fresh videos.
+    """
+    if request.args.get('refresh', '').lower() in ('1', 'true'):
+        invalidate_team_cache()
     return jsonify(get_all_team_videos())
 
 
@@ -3336,8 +3860,7 @@ def api_ai_generate():
 
         # Validate input image exists if provided
         if input_image:
-            input_path = COMFY_DIR / 'input' / input_image
-            if not input_path.exists():
+            if not os.path.exists(os.path.join(COMFY_INPUT_DIR_STR, input_image)):
                 return jsonify({'error': f'Input image not found: {input_image}. Please re-upload.'}), 400
 
         # If seed is -1, generate a random one
@@ -3379,7 +3902,7 @@ def api_ai_generate():
             actual_batch_size = batch_size
 
         # Send to ComfyUI
-        result = send_to_comfyui(workflow, gen_id, actual_batch_size)
+        result = send_to_comfyui(workflow, gen_id, actual_batch_size, save_node_id=IMAGE_SAVE_NODE_ID)
 
         if result.get('error'):
             return jsonify({'error': result['error']}), 500
@@ -3414,14 +3937,22 @@ def api_ai_generate():
         return jsonify({'error': str(e)}), 500
 
 
+def find_generation_image(gen_id):
+    """Return the path of a generated image in the generations root, or None."""
+    return next(
+        (path for ext in ('.png', '.jpg', '.jpeg')
+         if (path := GENERATIONS_DIR / f'{gen_id}{ext}').exists()),
+        None
+    )
+
+
 @app.route('/api/ai/image/<gen_id>')
 def api_ai_image(gen_id):
     """Serve a generated image."""
     # Look for the image in generations directory
-    for ext in ['.png', '.jpg', '.jpeg']:
-        image_path = GENERATIONS_DIR / f'{gen_id}{ext}'
-        if image_path.exists():
-            return send_file(str(image_path), mimetype='image/png')
+    image_path = find_generation_image(gen_id)
+    if image_path:
+        return send_file(str(image_path), mimetype=MIME_TYPES[image_path.suffix])
 
     # Check date-based directories
     today = datetime.now()
@@ -3431,7 +3962,7 @@ def api_ai_image(gen_id):
         for ext in ['.png', '.jpg']:
             image_path = date_dir / f'{gen_id}_full{ext}'
             if image_path.exists():
-                return send_file(str(image_path), mimetype='image/png')
+                return send_file(str(image_path), mimetype=MIME_TYPES[ext])
 
     return jsonify({'error': 'Image not found'}), 404
 
@@ -3445,7 +3976,7 @@ def api_ai_image_thumb(gen_id):
         date_dir = GENERATIONS_DIR / check_date.strftime('%Y/%m/%d')
         thumb_path = date_dir / f'{gen_id}_thumb.jpg'
         if thumb_path.exists():
-            return send_file(str(thumb_path), mimetype='image/jpeg')
+            return send_file(str(thumb_path), mimetype=MIME_TYPES['.jpg'])
 
     # Fall back to full image
     return api_ai_image(gen_id)
@@ -3523,16 +4054,9 @@ def api_ai_save():
             thumbnail_path_str = output_path_str
         else:
             # Check if image file exists
-            image_path = GENERATIONS_DIR / f'{gen_id}.png'
-            if not image_path.exists():
-                # Also check for batch images (gen_id_0, gen_id_1, etc.)
-                for ext in ['.png', '.jpg', '.jpeg']:
-                    test_path = GENERATIONS_DIR / f'{gen_id}{ext}'
-                    if test_path.exists():
-                        image_path = test_path
-                        break
-                else:
-                    return jsonify({'error': 'Image file not found'}), 404
+            image_path = find_generation_image(gen_id)
+            if not image_path:
+                return jsonify({'error': 'Image file not found'}), 404
 
             output_path_str = str(image_path)
             thumbnail_path_str = output_path_str
@@ -3563,11 +4087,9 @@ def api_ai_save():
 @app.route('/api/ai/generation/<gen_id>')
 def api_ai_generation(gen_id):
     """Get a saved generation's details for loading into the generate page."""
-    import sqlite3
-
-    db_path = DATABASES_DIR / 'generations.db'
+    db_path = GENERATIONS_DB_PATH_STR
     try:
-        conn = sqlite3.connect(str(db_path))
+        conn = sqlite3.connect(db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.execute('SELECT * FROM generations WHERE id = ?', (gen_id,))
         row = cursor.fetchone()
@@ -3582,12 +4104,10 @@ def api_ai_generation(gen_id):
 @app.route('/api/ai/generation/<gen_id>', methods=['DELETE'])
 def api_ai_delete_generation(gen_id):
     """Delete a saved generation from the database and optionally its files."""
-    import sqlite3
-
-    db_path = DATABASES_DIR / 'generations.db'
+    db_path = GENERATIONS_DB_PATH_STR
     try:
         # Get the generation info first
-        conn = sqlite3.connect(str(db_path))
+        conn = sqlite3.connect(db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.execute('SELECT output_path, thumbnail_path FROM generations WHERE id = ?', (gen_id,))
         row = cursor.fetchone()
@@ -3632,7 +4152,8 @@ def api_ai_generate_video():
 
     try:
         params = request.get_json()
-        logger.info(f"Request params: {json.dumps(params, indent=2)}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Request params: %s", json.dumps(params, indent=2))
 
         # Validate required fields
         if not params.get('prompt'):
@@ -3643,23 +4164,22 @@ def api_ai_generate_video():
             return jsonify({'error': 'Input image is required for img2vid'}), 400
 
         # Validate input image exists
-        input_image_path = COMFY_DIR / 'input' / params.get('input_image')
-        logger.info(f"Input image path: {input_image_path}")
-        logger.info(f"Input image exists: {input_image_path.exists()}")
-        if not input_image_path.exists():
-            logger.error(f"Input image not found: {input_image_path}")
+        input_image_path = os.path.join(COMFY_INPUT_DIR_STR, params.get('input_image'))
+        logger.info("Input image path: %s", input_image_path)
+        if not os.path.exists(input_image_path):
+            logger.error("Input image not found: %s", input_image_path)
             return jsonify({'error': f'Input image not found: {params.get("input_image")}. Please re-upload.'}), 400
 
         # Check if ComfyUI is running
         comfy_status = check_comfy_status()
-        logger.info(f"ComfyUI status: {comfy_status}")
+        logger.info("ComfyUI status: %s", comfy_status)
         if not comfy_status['running']:
             logger.error("ComfyUI is not running")
             return jsonify({'error': 'ComfyUI is not running. Start it first.'}), 503
 
         # Generate unique ID for this generation
         gen_id = str(uuid.uuid4())[:8]
-        logger.info(f"Generation ID: {gen_id}")
+        logger.info("Generation ID: %s", gen_id)
 
         # Prepare generation parameters
         prompt = params.get('prompt', '')
@@ -3707,9 +4227,9 @@ def api_ai_generate_video():
             import random
             seed = random.randint(0, 2147483647)
 
-        logger.info(f"Video model: {video_model}")
-        logger.info(f"Dimensions: {width}x{height}, frames: {frames}, fps: {fps}")
-        logger.info(f"Seed: {seed}, steps: {steps}, cfg: {cfg_scale}, motion: {motion_strength}")
+        logger.info("Video model: %s", video_model)
+        logger.info("Dimensions: %sx%s, frames: %s, fps: %s", width, height, frames, fps)
+        logger.info("Seed: %s, steps: %s, cfg: %s, motion: %s", seed, steps, cfg_scale, motion_strength)
 
         # Determine model type
         if 'ltx' in video_model.lower():
@@ -3721,7 +4241,7 @@ def api_ai_generate_video():
         else:
             model_type = 'ltx'  # Default
 
-        logger.info(f"Model type detected: {model_type}")
+        logger.info("Model type detected: %s", model_type)
 
         # Build video generation workflow
         logger.info("Building video workflow...")
@@ -3750,39 +4270,41 @@ def api_ai_generate_video():
             embedded_cfg_scale=embedded_cfg_scale,  # Hunyuan
             crf=crf,                        # All (encoding quality)
         )
-        logger.info(f"Workflow built with {len(workflow)} nodes")
-        logger.debug(f"Workflow nodes: {list(workflow.keys())}")
+        logger.info("Workflow built with %d nodes", len(workflow))
+        logger.debug("Workflow nodes: %s", workflow.keys())
 
         # Send to ComfyUI with extended timeout for video (30 minutes)
         logger.info("Sending workflow to ComfyUI (30 min timeout for video)...")
-        result = send_to_comfyui(workflow, gen_id, batch_size=1, max_wait=1800)
-        logger.info(f"ComfyUI result: {result}")
+        result = send_to_comfyui(workflow, gen_id, batch_size=1, max_wait=1800,
+                                 save_node_id=VIDEO_SAVE_NODE_IDS.get(model_type))
+        logger.info("ComfyUI result: %s", result)
 
         if result.get('error'):
-            logger.error(f"ComfyUI returned error: {result['error']}")
+            logger.error("ComfyUI returned error: %s", result['error'])
             return jsonify({'error': result['error']}), 500
 
         # Look for video output
         logger.info("Looking for video output...")
         video_path = None
         output_dir = COMFY_DIR / 'output'
-        logger.info(f"Output directory: {output_dir}")
+        logger.info("Output directory: %s", output_dir)
 
-        # List recent files in output dir for debugging
-        try:
-            recent_files = sorted(output_dir.glob('*'), key=lambda x: x.stat().st_mtime, reverse=True)[:20]
-            logger.info(f"Recent files in output: {[f.name for f in recent_files]}")
-        except Exception as e:
-            logger.warning(f"Could not list output dir: {e}")
+        # List recent files in output dir for debugging (full directory scan, so DEBUG only)
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
+                recent_files = sorted(output_dir.glob('*'), key=lambda x: x.stat().st_mtime, reverse=True)[:20]
+                logger.debug("Recent files in output: %s", [f.name for f in recent_files])
+            except Exception as e:
+                logger.warning("Could not list output dir: %s", e)
 
         for ext in ['.mp4', '.webm', '.gif']:
             pattern = f'boomshakalaka_video_{gen_id}*{ext}'
-            logger.debug(f"Trying pattern: {pattern}")
+            logger.debug("Trying pattern: %s", pattern)
             matches = list(output_dir.glob(pattern))
-            logger.debug(f"Matches: {matches}")
+            logger.debug("Matches: %s", matches)
             if matches:
                 video_path = matches[0]
-                logger.info(f"Found video with pattern: {video_path}")
+                logger.info("Found video with pattern: %s", video_path)
                 break
 
         if not video_path:
@@ -3790,15 +4312,15 @@ def api_ai_generate_video():
             # Try general pattern
             for ext in ['.mp4', '.webm']:
                 recent = list(output_dir.glob(f'*{ext}'))
-                logger.debug(f"Found {len(recent)} {ext} files")
+                logger.debug("Found %d %s files", len(recent), ext)
                 if recent:
                     recent.sort(key=lambda x: x.stat().st_mtime, reverse=True)
                     video_path = recent[0]
-                    logger.info(f"Using most recent video: {video_path}")
+                    logger.info("Using most recent video: %s", video_path)
                     break
 
         if video_path:
-            logger.info(f"SUCCESS! Video found: {video_path}")
+            logger.info("SUCCESS! Video found: %s", video_path)
             return jsonify({
                 'video_url': f'/api/ai/video/{gen_id}',
                 'id': gen_id,
@@ -3815,7 +4337,7 @@ def api_ai_generate_video():
         return jsonify({'error': 'ComfyUI request timed out. Video generation may take several minutes. Check ComfyUI console.'}), 504
     except Exception as e:
         import traceback
-        logger.error(f"Exception in video generation: {e}")
+        logger.error("Exception in video generation: %s", e)
         logger.error(traceback.format_exc())
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
@@ -3825,11 +4347,10 @@ def api_ai_generate_video():
 def api_ai_video(gen_id):
     """Serve a generated video file."""
     # First, check database for saved video with output_path
-    db_path = DATABASES_DIR / 'generations.db'
-    if db_path.exists():
+    db_path = GENERATIONS_DB_PATH_STR
+    if os.path.exists(db_path):
         try:
-            import sqlite3
-            conn = sqlite3.connect(str(db_path))
+            conn = sqlite3.connect(db_path)
             conn.row_factory = sqlite3.Row
             cursor = conn.execute('SELECT output_path FROM generations WHERE id = ?', (gen_id,))
             row = cursor.fetchone()
@@ -3837,8 +4358,7 @@ def api_ai_video(gen_id):
             if row and row['output_path']:
                 video_path = Path(row['output_path'])
                 if video_path.exists():
-                    ext = video_path.suffix.lower()
-                    mimetype = 'video/mp4' if ext == '.mp4' else 'video/webm' if ext == '.webm' else 'image/gif'
+                    mimetype = MIME_TYPES.get(video_path.suffix.lower(), 'application/octet-stream')
                     return send_file(str(video_path), mimetype=mimetype)
         except Exception as e:
             logger.error(f"Error checking database for video: {e}")
@@ -3850,14 +4370,14 @@ def api_ai_video(gen_id):
         pattern = f'boomshakalaka_video_{gen_id}*{ext}'
         matches = list(output_dir.glob(pattern))
         if matches:
-            return send_file(matches[0], mimetype=f'video/{ext[1:]}')
+            return send_file(matches[0], mimetype=MIME_TYPES[ext])
 
     # Fallback to most recent video
     for ext in ['.mp4', '.webm']:
         recent = list(output_dir.glob(f'*{ext}'))
         if recent:
             recent.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-            return send_file(recent[0], mimetype=f'video/{ext[1:]}')
+            return send_file(recent[0], mimetype=MIME_TYPES[ext])
 
     return jsonify({'error': 'Video not found'}), 404
 
@@ -3875,6 +4395,60 @@ def api_ai_video_model_params():
     })
 
 
+def resolve_output_path(path):
+    """Return path as a string, relative paths resolved against the ComfyUI output dir."""
+    if os.path.isabs(path):
+        return path
+    return os.path.join(COMFY_OUTPUT_DIR_STR, path)
+
+
+def find_video_by_id(output_dir, video_id, exts=('.mp4', '.webm', '.gif')):
+    """Find a video whose filename contains video_id with a single directory scan.
+
+    Earlier extensions in exts win when several files match.
+    """
+    # JSON bodies may send numeric IDs
+    video_id = str(video_id)
+    best_path = None
+    best_rank = len(exts)
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if video_id not in name or name.startswith('.'):
+                continue
+            for rank in range(best_rank):
+                if name.endswith(exts[rank]):
+                    best_path, best_rank = entry.path, rank
+                    break
+            if best_rank == 0:
+                break
+    return Path(best_path) if best_path else None
+
+
+def find_videos_by_ids(output_dir, video_ids, exts=('.mp4', '.webm')):
+    """Resolve several video IDs with one directory scan.
+
+    Returns a dict mapping each ID to its Path, or None if nothing matched.
+    Earlier extensions in exts win, as in find_video_by_id().
+    """
+    found = {vid: (len(exts), None) for vid in video_ids}
+    pending = set(found)
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith('.') or not name.endswith(exts):
+                continue
+            rank = next(i for i, ext in enumerate(exts) if name.endswith(ext))
+            for vid in list(pending):
+                if vid in name and rank < found[vid][0]:
+                    found[vid] = (rank, entry.path)
+                    if rank == 0:
+                        pending.discard(vid)
+            if not pending:
+                break
+    return {vid: Path(path) if path else None for vid, (_, path) in found.items()}
+
+
 @app.route('/api/ai/video/extract-frame', methods=['POST'])
 def api_ai_video_extract_frame():
     """Extract first or last frame from a video file.
@@ -3899,24 +4473,16 @@ def api_ai_video_extract_frame():
 
         # Find video file
         if video_path:
-            video_file = Path(video_path)
-            if not video_file.is_absolute():
-                video_file = COMFY_DIR / 'output' / video_path
+            video_file = resolve_output_path(video_path)
         elif video_id:
             # Look up video by generation ID
-            output_dir = COMFY_DIR / 'output'
-            video_file = None
-            for ext in ['.mp4', '.webm', '.gif']:
-                matches = list(output_dir.glob(f'*{video_id}*{ext}'))
-                if matches:
-                    video_file = matches[0]
-                    break
+            video_file = find_video_by_id(COMFY_OUTPUT_DIR_STR, video_id)
             if not video_file:
                 return jsonify({'error': f'Video not found for ID: {video_id}'}), 404
         else:
             return jsonify({'error': 'Either video_path or video_id is required'}), 400
 
-        if not video_file.exists():
+        if not os.path.exists(video_file):
             return jsonify({'error': f'Video file not found: {video_file}'}), 404
 
         # Generate output filename
@@ -3925,7 +4491,8 @@ def api_ai_video_extract_frame():
             output_name = f'frame_{position}_{timestamp}.png'
 
         # Output to ComfyUI input directory for immediate use
-        output_path = COMFY_DIR / 'input' / output_name
+        output_path = Path(COMFY_INPUT_DIR_STR, output_name)
+        video_file = Path(video_file)
 
         # Extract frame
         video_utils = get_video_utils()
@@ -3962,27 +4529,19 @@ def api_ai_video_info():
 
         # Find video file
         if video_path:
-            video_file = Path(video_path)
-            if not video_file.is_absolute():
-                video_file = COMFY_DIR / 'output' / video_path
+            video_file = resolve_output_path(video_path)
         elif video_id:
-            output_dir = COMFY_DIR / 'output'
-            video_file = None
-            for ext in ['.mp4', '.webm']:
-                matches = list(output_dir.glob(f'*{video_id}*{ext}'))
-                if matches:
-                    video_file = matches[0]
-                    break
+            video_file = find_video_by_id(COMFY_OUTPUT_DIR_STR, video_id, exts=('.mp4', '.webm'))
             if not video_file:
                 return jsonify({'error': f'Video not found for ID: {video_id}'}), 404
         else:
             return jsonify({'error': 'Either video_path or video_id is required'}), 400
 
-        if not video_file.exists():
+        if not os.path.exists(video_file):
             return jsonify({'error': f'Video file not found: {video_file}'}), 404
 
         video_utils = get_video_utils()
-        info = video_utils.get_video_info(video_file)
+        info = video_utils.get_video_info(Path(video_file))
         info['video_path'] = str(video_file)
 
         return jsonify(info)
@@ -4014,27 +4573,21 @@ def api_ai_video_stitch():
 
         # Resolve video files
         video_files = []
-        output_dir = COMFY_DIR / 'output'
 
         if video_paths:
             for vp in video_paths:
-                video_file = Path(vp)
-                if not video_file.is_absolute():
-                    video_file = output_dir / vp
-                if not video_file.exists():
+                video_file = resolve_output_path(vp)
+                if not os.path.exists(video_file):
                     return jsonify({'error': f'Video not found: {vp}'}), 404
-                video_files.append(video_file)
+                video_files.append(Path(video_file))
         elif video_ids:
+            # JSON bodies may send numeric IDs
+            video_ids = [str(vid) for vid in video_ids]
+            resolved = find_videos_by_ids(COMFY_OUTPUT_DIR_STR, video_ids)
             for vid in video_ids:
-                found = False
-                for ext in ['.mp4', '.webm']:
-                    matches = list(output_dir.glob(f'*{vid}*{ext}'))
-                    if matches:
-                        video_files.append(matches[0])
-                        found = True
-                        break
-                if not found:
+                if not resolved[vid]:
                     return jsonify({'error': f'Video not found for ID: {vid}'}), 404
+                video_files.append(resolved[vid])
         else:
             return jsonify({'error': 'Either video_paths or video_ids is required'}), 400
 
@@ -4046,7 +4599,7 @@ def api_ai_video_stitch():
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             output_name = f'stitched_{timestamp}.mp4'
 
-        output_path = output_dir / output_name
+        output_path = Path(COMFY_OUTPUT_DIR_STR, output_name)
 
         # Stitch videos
         video_utils = get_video_utils()
@@ -4088,14 +4641,11 @@ def api_ai_video_sequence_create():
         height = int(params.get('height', 768))
         fps = int(params.get('fps', 24))
 
-        db_path = DATABASES_DIR / 'generations.db'
-        conn = sqlite3.connect(str(db_path))
-        conn.execute('''
-            INSERT INTO video_sequences (id, name, base_prompt, video_model, width, height, fps, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, 'draft')
-        ''', (sequence_id, name, base_prompt, video_model, width, height, fps))
-        conn.commit()
-        conn.close()
+        with generations_db_lock, get_generations_db() as conn:
+            conn.execute('''
+                INSERT INTO video_sequences (id, name, base_prompt, video_model, width, height, fps, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 'draft')
+            ''', (sequence_id, name, base_prompt, video_model, width, height, fps))
 
         logger.info(f"Created video sequence: {sequence_id}")
 
@@ -4118,28 +4668,24 @@ def api_ai_video_sequence_create():
 def api_ai_video_sequence_get(sequence_id):
     """Get a video sequence and its segments."""
     try:
-        db_path = DATABASES_DIR / 'generations.db'
-        conn = sqlite3.connect(str(db_path))
-        conn.row_factory = sqlite3.Row
-
-        # Get sequence
-        cursor = conn.execute('SELECT * FROM video_sequences WHERE id = ?', (sequence_id,))
-        sequence = cursor.fetchone()
-        if not sequence:
-            conn.close()
-            return jsonify({'error': 'Sequence not found'}), 404
-
-        # Get segments
-        cursor = conn.execute('''
-            SELECT * FROM video_segments
-            WHERE sequence_id = ?
-            ORDER BY segment_order
-        ''', (sequence_id,))
-        segments = [dict(row) for row in cursor.fetchall()]
-
-        conn.close()
-
-        return jsonify({
+        with generations_db_lock:
+            conn = get_generations_db()
+
+            # Get sequence
+            cursor = conn.execute('SELECT * FROM video_sequences WHERE id = ?', (sequence_id,))
+            sequence = cursor.fetchone()
+            if not sequence:
+                return jsonify({'error': 'Sequence not found'}), 404
+
+            # Get segments
+            cursor = conn.execute('''
+                SELECT * FROM video_segments
+                WHERE sequence_id = ?
+                ORDER BY segment_order
+            ''', (sequence_id,))
+            segments = [dict(row) for row in cursor.fetchall()]
+
+        return fast_jsonify({
             'sequence': dict(sequence),
             'segments': segments
         })
@@ -4166,31 +4712,32 @@ def api_ai_video_sequence_add_segment(sequence_id):
         last_frame_path = params.get('last_frame_path')
         duration = params.get('duration')
 
-        db_path = DATABASES_DIR / 'generations.db'
-        conn = sqlite3.connect(str(db_path))
-
-        # Get next segment order
-        cursor = conn.execute('''
-            SELECT COALESCE(MAX(segment_order), -1) + 1 as next_order
-            FROM video_segments WHERE sequence_id = ?
-        ''', (sequence_id,))
-        next_order = cursor.fetchone()[0]
-
-        # Insert segment
-        conn.execute('''
-            INSERT INTO video_segments (id, sequence_id, segment_order, prompt, seed, video_path, last_frame_path, duration, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'completed')
-        ''', (segment_id, sequence_id, next_order, prompt, seed, video_path, last_frame_path, duration))
-
-        # Update sequence total duration
-        cursor = conn.execute('''
-            SELECT COALESCE(SUM(duration), 0) as total FROM video_segments WHERE sequence_id = ?
-        ''', (sequence_id,))
-        total_duration = cursor.fetchone()[0]
-        conn.execute('UPDATE video_sequences SET total_duration = ? WHERE id = ?', (total_duration, sequence_id))
-
-        conn.commit()
-        conn.close()
+        # The connection context commits on success and rolls back on error
+        with generations_db_lock, get_generations_db() as conn:
+            # Get next segment order
+            cursor = conn.execute('''
+                SELECT COALESCE(MAX(segment_order), -1) + 1 as next_order
+                FROM video_segments WHERE sequence_id = ?
+            ''', (sequence_id,))
+            next_order = cursor.fetchone()[0]
+
+            # Insert segment
+            conn.execute('''
+                INSERT INTO video_segments (id, sequence_id, segment_order, prompt, seed, video_path, last_frame_path, duration, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'completed')
+            ''', (segment_id, sequence_id, next_order, prompt, seed, video_path, last_frame_path, duration))
+
+            # Update sequence total duration, summing in SQL
+            cursor = conn.execute('''
+                UPDATE video_sequences
+                SET total_duration = (
+                    SELECT COALESCE(SUM(duration), 0) FROM video_segments WHERE sequence_id = ?
+                )
+                WHERE id = ?
+                RETURNING total_duration
+            ''', (sequence_id, sequence_id))
+            row = cursor.fetchone()
+            total_duration = row[0] if row else 0
 
         logger.info(f"Added segment {segment_id} to sequence {sequence_id}")
 
@@ -4206,53 +4753,82 @@ def api_ai_video_sequence_add_segment(sequence_id):
         return jsonify({'error': str(e)}), 500
 
 
+# Columns returned by the sequence listing, in SELECT order
+SEQUENCE_LIST_COLUMNS = (
+    'id', 'created_at', 'updated_at', 'name', 'description',
+    'base_prompt', 'base_negative_prompt', 'base_seed', 'video_model',
+    'width', 'height', 'fps', 'stitched_video_path', 'total_duration',
+    'total_frames', 'status', 'segment_count',
+)
+SEQUENCE_LIST_SQL = f'''
+    SELECT {', '.join('vs.' + col for col in SEQUENCE_LIST_COLUMNS[:-1])},
+           COUNT(seg.id) AS segment_count
+    FROM video_sequences vs
+    LEFT JOIN video_segments seg ON vs.id = seg.sequence_id
+    GROUP BY vs.id
+    ORDER BY vs.created_at DESC
+'''
+
+
 @app.route('/api/ai/video/sequences', methods=['GET'])
 def api_ai_video_sequences_list():
     """List all video sequences."""
     try:
-        db_path = DATABASES_DIR / 'generations.db'
-        conn = sqlite3.connect(str(db_path))
-        conn.row_factory = sqlite3.Row
-
-        cursor = conn.execute('''
-            SELECT vs.*, COUNT(seg.id) as segment_count
-            FROM video_sequences vs
-            LEFT JOIN video_segments seg ON vs.id = seg.sequence_id
-            GROUP BY vs.id
-            ORDER BY vs.created_at DESC
-        ''')
-        sequences = [dict(row) for row in cursor.fetchall()]
-
-        conn.close()
+        with generations_db_lock:
+            # Plain tuples are cheaper than sqlite3.Row when every column is read anyway
+            cursor = get_generations_db().cursor()
+            cursor.row_factory = None
+            cursor.execute(SEQUENCE_LIST_SQL)
+            sequences = [dict(zip(SEQUENCE_LIST_COLUMNS, row)) for row in cursor]
 
-        return jsonify({'sequences': sequences})
+        return fast_jsonify({'sequences': sequences})
 
     except Exception as e:
         logger.error(f"Error listing sequences: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+# (dir mtime, monotonic time, files) for the last debug/outputs listing, reused
+# until the output directory's mtime changes or MODEL_LIST_TTL passes
+_output_listing_cache = {'entry': (None, 0.0, None)}
+
+
 @app.route('/api/ai/debug/outputs')
 def api_ai_debug_outputs():
     """List recent files in ComfyUI output directory for debugging."""
     logger.info("Debug: Listing output directory")
-    output_dir = COMFY_DIR / 'output'
+    output_dir = COMFY_OUTPUT_DIR_STR
 
-    files = []
     try:
-        for f in sorted(output_dir.glob('*'), key=lambda x: x.stat().st_mtime, reverse=True)[:50]:
-            files.append({
-                'name': f.name,
-                'size': f.stat().st_size,
-                'mtime': datetime.fromtimestamp(f.stat().st_mtime).isoformat(),
-                'is_video': f.suffix.lower() in ['.mp4', '.webm', '.gif'],
-            })
+        dir_mtime = os.stat(output_dir).st_mtime_ns
+        now = time.monotonic()
+        cached_mtime, cached_at, files = _output_listing_cache['entry']
+        # Outputs still being written grow without touching the directory
+        # mtime, so also re-list after MODEL_LIST_TTL to refresh their sizes
+        if cached_mtime != dir_mtime or now - cached_at >= MODEL_LIST_TTL:
+            entries = []
+            with os.scandir(output_dir) as it:
+                for entry in it:
+                    if entry.name.startswith('.'):
+                        continue
+                    st = entry.stat()
+                    entries.append((entry.name, st.st_size, st.st_mtime))
+            # Only the newest 50 are shown, so keep a bounded heap instead of sorting everything
+            newest = heapq.nlargest(50, entries, key=lambda e: e[2])
+
+            files = [{
+                'name': name,
+                'size': size,
+                'mtime': datetime.fromtimestamp(mtime).isoformat(),
+                'is_video': os.path.splitext(name)[1].lower() in ('.mp4', '.webm', '.gif'),
+            } for name, size, mtime in newest]
+            _output_listing_cache['entry'] = (dir_mtime, now, files)
     except Exception as e:
         logger.error(f"Error listing output dir: {e}")
         return jsonify({'error': str(e)}), 500
 
     return jsonify({
-        'output_dir': str(output_dir),
+        'output_dir': output_dir,
         'file_count': len(files),
         'files': files
     })
@@ -4309,7 +4885,7 @@ def api_ai_debug_workflow():
             crf=crf,
         )
 
-        return jsonify({
+        return fast_jsonify({
             'model_type': model_type,
             'node_count': len(workflow),
             'node_ids': list(workflow.keys()),
@@ -4322,14 +4898,16 @@ def api_ai_debug_workflow():
         return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
 
 
+# Node name prefixes reported by the ComfyUI debug endpoint
+VIDEO_NODE_PATTERN = re.compile(r'LTXV|Wan|Hunyuan|VHS_|Video')
+
+
 @app.route('/api/ai/debug/comfyui')
 def api_ai_debug_comfyui():
     """Check ComfyUI status and available nodes."""
     logger.info("Debug: Checking ComfyUI status")
 
     try:
-        import httpx
-
         # Check if ComfyUI is running
         status = check_comfy_status()
 
@@ -4337,20 +4915,21 @@ def api_ai_debug_comfyui():
         nodes_info = {}
         if status['running']:
             try:
-                response = httpx.get(f'http://{COMFY_HOST}:{COMFY_PORT}/object_info', timeout=10)
+                response = comfy_client.get('/object_info')
                 if response.status_code == 200:
-                    all_nodes = response.json()
+                    all_nodes = fast_json_loads(response.content)
                     # Just return video-related nodes
-                    video_node_prefixes = ['LTXV', 'Wan', 'Hunyuan', 'VHS_', 'Video']
-                    for node_name in all_nodes:
-                        if any(node_name.startswith(prefix) for prefix in video_node_prefixes):
-                            nodes_info[node_name] = {
-                                'input_types': list(all_nodes[node_name].get('input', {}).get('required', {}).keys()),
-                            }
+                    nodes_info = {
+                        node_name: {
+                            'input_types': list(node.get('input', {}).get('required', {}).keys()),
+                        }
+                        for node_name, node in all_nodes.items()
+                        if VIDEO_NODE_PATTERN.match(node_name)
+                    }
             except Exception as e:
                 logger.warning(f"Could not get object info: {e}")
 
-        return jsonify({
+        return fast_jsonify({
             'comfyui_status': status,
             'video_nodes': nodes_info,
             'video_node_count': len(nodes_info)
@@ -4373,7 +4952,6 @@ def api_ai_upload():
             return jsonify({'error': 'No file selected'}), 400
 
         # Generate a unique filename
-        import os
         ext = os.path.splitext(file.filename)[1].lower()
         if ext not in ['.png', '.jpg', '.jpeg', '.webp']:
             return jsonify({'error': 'Invalid file type. Use PNG, JPG, or WebP'}), 400
@@ -4383,15 +4961,10 @@ def api_ai_upload():
         comfy_input_dir = COMFY_DIR / 'input'
         comfy_input_dir.mkdir(parents=True, exist_ok=True)
 
+        # ComfyUI's input folder is the canonical copy; api_ai_upload_get serves from it
         upload_path = comfy_input_dir / upload_filename
         file.save(str(upload_path))
 
-        # Also save a copy to our uploads folder for reference
-        uploads_dir = PROJECT_ROOT / 'data' / 'uploads'
-        uploads_dir.mkdir(parents=True, exist_ok=True)
-        import shutil
-        shutil.copy2(str(upload_path), str(uploads_dir / upload_filename))
-
         return jsonify({
             'filename': upload_filename,
             'path': str(upload_path),
@@ -4402,18 +4975,25 @@ def api_ai_upload():
         return jsonify({'error': str(e)}), 500
 
 
+UPLOAD_CACHE_MAX_AGE = 31536000  # One year
+
+
 @app.route('/api/ai/upload/<filename>')
 def api_ai_upload_get(filename):
-    """Serve an uploaded image."""
+    """Serve an uploaded image.
+
+    Upload filenames contain a random suffix and are never rewritten, so
+    browsers may cache them indefinitely.
+    """
     # Check ComfyUI input folder
-    image_path = COMFY_DIR / 'input' / filename
-    if image_path.exists():
-        return send_file(str(image_path))
+    image_path = os.path.join(COMFY_INPUT_DIR_STR, filename)
+    if os.path.exists(image_path):
+        return send_file(image_path, max_age=UPLOAD_CACHE_MAX_AGE)
 
-    # Check our uploads folder
+    # Older uploads also kept a reference copy in our uploads folder
     image_path = PROJECT_ROOT / 'data' / 'uploads' / filename
     if image_path.exists():
-        return send_file(str(image_path))
+        return send_file(str(image_path), max_age=UPLOAD_CACHE_MAX_AGE)
 
     return jsonify({'error': 'Image not found'}), 404
 
@@ -4452,8 +5032,25 @@ def api_ai_delete_lora():
         return jsonify({'error': str(e)}), 500
 
 
-# Track active downloads
-active_downloads = {}
+# Track active downloads. Written by download threads and read by the status
+# endpoint, so all access goes through active_downloads_lock.
+MAX_TRACKED_DOWNLOADS = 256
+active_downloads = OrderedDict()
+active_downloads_lock = threading.Lock()
+
+
+def update_download_status(download_id, **fields):
+    """Update a tracked download, evicting the oldest finished ones past the cap."""
+    with active_downloads_lock:
+        active_downloads.setdefault(download_id, {}).update(fields)
+        if fields.get('status') in ('complete', 'error') and len(active_downloads) > MAX_TRACKED_DOWNLOADS:
+            finished = [d for d, info in active_downloads.items() if info.get('status') in ('complete', 'error')]
+            for old_id in finished[:len(active_downloads) - MAX_TRACKED_DOWNLOADS]:
+                del active_downloads[old_id]
+
+# Patterns used by the model download thread
+CIVITAI_VERSION_PATTERN = re.compile(r'modelVersionId=(\d+)')
+CONTENT_DISPOSITION_FILENAME_PATTERN = re.compile(r'filename[*]?=["\']?(?:UTF-8\'\')?([^"\';\n]+)')
 
 
 @app.route('/api/ai/models/download', methods=['POST'])
@@ -4482,17 +5079,15 @@ def api_ai_download_model():
         target_dir.mkdir(parents=True, exist_ok=True)
 
         # Start download in background thread
-        import threading
-
         def download_file():
-            import requests
             try:
-                active_downloads[download_id] = {
-                    'status': 'downloading',
-                    'progress': 0,
-                    'filename': None,
-                    'error': None
-                }
+                update_download_status(
+                    download_id,
+                    status='downloading',
+                    progress=0,
+                    filename=None,
+                    error=None,
+                )
 
                 # Handle different URL types
                 download_url = url
@@ -4505,8 +5100,7 @@ def api_ai_download_model():
                 if 'civitai.com' in url:
                     # Extract model version ID if it's a model page URL
                     if '/models/' in url and '?modelVersionId=' in url:
-                        import re
-                        match = re.search(r'modelVersionId=(\d+)', url)
+                        match = CIVITAI_VERSION_PATTERN.search(url)
                         if match:
                             version_id = match.group(1)
                             download_url = f'https://civitai.com/api/download/models/{version_id}'
@@ -4516,15 +5110,13 @@ def api_ai_download_model():
                         pass
 
                 # Start download with streaming
-                headers = {'User-Agent': 'Boomshakalaka-AI-Studio/1.0'}
-                response = requests.get(download_url, stream=True, headers=headers, allow_redirects=True, timeout=30)
+                response = model_download_session.get(download_url, stream=True, allow_redirects=True, timeout=30)
                 response.raise_for_status()
 
                 # Try to get filename from Content-Disposition header
                 content_disp = response.headers.get('Content-Disposition', '')
                 if 'filename=' in content_disp:
-                    import re
-                    match = re.search(r'filename[*]?=["\']?(?:UTF-8\'\')?([^"\';\n]+)', content_disp)
+                    match = CONTENT_DISPOSITION_FILENAME_PATTERN.search(content_disp)
                     if match:
                         filename = match.group(1)
                     else:
@@ -4536,27 +5128,30 @@ def api_ai_download_model():
                 if not filename.endswith(('.safetensors', '.ckpt', '.pt')):
                     filename += '.safetensors'
 
-                active_downloads[download_id]['filename'] = filename
+                update_download_status(download_id, filename=filename)
                 target_path = target_dir / filename
 
                 # Get total size if available
                 total_size = int(response.headers.get('content-length', 0))
                 downloaded = 0
 
+                # Read the raw stream in 1 MiB blocks - multi-GB checkpoints
+                # would otherwise spend their time in 8 KiB Python iterations
+                response.raw.decode_content = True
                 with open(target_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            if total_size > 0:
-                                active_downloads[download_id]['progress'] = int((downloaded / total_size) * 100)
+                    while True:
+                        buf = response.raw.read(1 << 20)
+                        if not buf:
+                            break
+                        f.write(buf)
+                        downloaded += len(buf)
+                        if total_size > 0:
+                            update_download_status(download_id, progress=(downloaded * 100) // total_size)
 
-                active_downloads[download_id]['status'] = 'complete'
-                active_downloads[download_id]['progress'] = 100
+                update_download_status(download_id, status='complete', progress=100)
 
             except Exception as e:
-                active_downloads[download_id]['status'] = 'error'
-                active_downloads[download_id]['error'] = str(e)
+                update_download_status(download_id, status='error', error=str(e))
 
         thread = threading.Thread(target=download_file)
         thread.daemon = True
@@ -4575,24 +5170,68 @@ def api_ai_download_model():
 @app.route('/api/ai/models/download/<download_id>')
 def api_ai_download_status(download_id):
     """Get download progress."""
-    if download_id not in active_downloads:
+    with active_downloads_lock:
+        download = active_downloads.get(download_id)
+        download = dict(download) if download is not None else None
+
+    if download is None:
         return jsonify({'error': 'Download not found'}), 404
 
-    return jsonify(active_downloads[download_id])
+    return jsonify(download)
 
 
-def build_txt2img_workflow(prompt, negative_prompt, model, width, height, seed, steps, cfg_scale, sampler, loras=None, batch_size=1):
-    """Build a ComfyUI workflow for text-to-image generation.
+LORA_LOADER_CLASS = "LoraLoader"
 
-    Args:
-        loras: List of dicts with 'filename' and 'strength' (0.0-2.0)
-        batch_size: Number of images to generate in one batch (1-20)
+# Save node ids used by the workflow builders, so send_to_comfyui can read
+# the result straight from that node's output
+IMAGE_SAVE_NODE_ID = "9"  # txt2img and img2img SaveImage
+VIDEO_SAVE_NODE_IDS = {'ltx': "15", 'wan': "10", 'hunyuan': "8"}  # VHS_VideoCombine
+
+
+def chain_loras(workflow, loras):
+    """Chain LoraLoader nodes after checkpoint node "4" in an SD workflow.
+
+    Each LoRA feeds from the previous one's outputs; the text encoders ("6",
+    "7") and KSampler ("3") are rewired to the last LoRA in the chain.
+    Node references are tuples so no two nodes share a mutable input list.
     """
-    loras = loras or []
-    batch_size = max(1, min(20, batch_size))  # Clamp to 1-20
+    # Track the current model and clip outputs for chaining LoRAs
+    current_model_source = ("4", 0)  # CheckpointLoader model output
+    current_clip_source = ("4", 1)   # CheckpointLoader clip output
+
+    for i, lora in enumerate(loras):
+        lora_filename = lora.get('filename')
+        if not lora_filename:
+            continue
+        lora_strength = float(lora.get('strength', 1.0))
+
+        node_id = f"lora_{i}"
+        workflow[node_id] = {"class_type": LORA_LOADER_CLASS, "inputs": {
+            "lora_name": lora_filename,
+            "strength_model": lora_strength,
+            "strength_clip": lora_strength,
+            "model": current_model_source,
+            "clip": current_clip_source,
+        }}
+        # Update current sources to this LoRA's outputs
+        current_model_source = (node_id, 0)
+        current_clip_source = (node_id, 1)
+
+    # Text encoders and KSampler use the final model/clip source (after LoRAs)
+    workflow["6"]["inputs"]["clip"] = current_clip_source
+    workflow["7"]["inputs"]["clip"] = current_clip_source
+    workflow["3"]["inputs"]["model"] = current_model_source
 
+
+@lru_cache(maxsize=64)
+def _txt2img_template(model, width, height, batch_size, steps, sampler):
+    """Return a pickled LoRA-less txt2img workflow for one model/shape/sampler combo.
+
+    The UI mostly re-submits the same presets, so the node graph is built once
+    and build_txt2img_workflow() unpickles a fresh copy and fills in the
+    per-request fields (prompts, seed, cfg). The cached blob is never mutated.
+    """
     # ComfyUI uses node-based workflows defined as JSON
-    # Base nodes that are always present
     workflow = {
         "4": {
             "class_type": "CheckpointLoaderSimple",
@@ -4621,71 +5260,133 @@ def build_txt2img_workflow(prompt, negative_prompt, model, width, height, seed,
                 "filename_prefix": "boomshakalaka",
                 "images": ["8", 0]
             }
+        },
+        # CLIP text encoders read straight from the checkpoint until LoRAs are chained in
+        "6": {
+            "class_type": "CLIPTextEncode",
+            "inputs": {
+                "text": "",
+                "clip": ["4", 1]
+            }
+        },
+        "7": {
+            "class_type": "CLIPTextEncode",
+            "inputs": {
+                "text": "",
+                "clip": ["4", 1]
+            }
+        },
+        "3": {
+            "class_type": "KSampler",
+            "inputs": {
+                "seed": 0,
+                "steps": steps,
+                "cfg": 0,
+                "sampler_name": sampler,
+                "scheduler": "normal",
+                "denoise": 1.0,
+                "model": ["4", 0],
+                "positive": ["6", 0],
+                "negative": ["7", 0],
+                "latent_image": ["5", 0]
+            }
         }
     }
+    return pickle.dumps(workflow, pickle.HIGHEST_PROTOCOL)
 
-    # Track the current model and clip outputs for chaining LoRAs
-    current_model_source = ["4", 0]  # CheckpointLoader model output
-    current_clip_source = ["4", 1]   # CheckpointLoader clip output
 
-    # Add LoRA loaders if any are specified
-    # Each LoRA chains from the previous one's output
-    for i, lora in enumerate(loras):
-        lora_filename = lora.get('filename', '')
-        lora_strength = float(lora.get('strength', 1.0))
+def build_txt2img_workflow(prompt, negative_prompt, model, width, height, seed, steps, cfg_scale, sampler, loras=None, batch_size=1):
+    """Build a ComfyUI workflow for text-to-image generation.
 
-        if not lora_filename:
-            continue
+    Args:
+        loras: List of dicts with 'filename' and 'strength' (0.0-2.0)
+        batch_size: Number of images to generate in one batch (1-20)
+    """
+    batch_size = max(1, min(20, batch_size))  # Clamp to 1-20
 
-        node_id = f"lora_{i}"
-        workflow[node_id] = {
-            "class_type": "LoraLoader",
-            "inputs": {
-                "lora_name": lora_filename,
-                "strength_model": lora_strength,
-                "strength_clip": lora_strength,
-                "model": current_model_source,
-                "clip": current_clip_source,
-            }
-        }
-        # Update current sources to this LoRA's outputs
-        current_model_source = [node_id, 0]
-        current_clip_source = [node_id, 1]
+    workflow = pickle.loads(_txt2img_template(model, width, height, batch_size, steps, sampler))
+    workflow["6"]["inputs"]["text"] = prompt
+    workflow["7"]["inputs"]["text"] = negative_prompt or ""
+    sampler_inputs = workflow["3"]["inputs"]
+    sampler_inputs["seed"] = seed
+    sampler_inputs["cfg"] = cfg_scale
 
-    # CLIP text encoders - use final model/clip source (after LoRAs if any)
-    workflow["6"] = {
+    if loras:
+        chain_loras(workflow, loras)
+
+    return workflow
+
+
+# Static img2img node graph; build_img2img_workflow() unpickles a copy per
+# request and fills in the None placeholders
+IMG2IMG_TEMPLATE = pickle.dumps({
+    "4": {
+        "class_type": "CheckpointLoaderSimple",
+        "inputs": {
+            "ckpt_name": None
+        }
+    },
+    # Load the input image
+    "10": {
+        "class_type": "LoadImage",
+        "inputs": {
+            "image": None
+        }
+    },
+    # Encode the image to latent space
+    "11": {
+        "class_type": "VAEEncode",
+        "inputs": {
+            "pixels": ["10", 0],
+            "vae": ["4", 2]
+        }
+    },
+    "8": {
+        "class_type": "VAEDecode",
+        "inputs": {
+            "samples": ["3", 0],
+            "vae": ["4", 2]
+        }
+    },
+    "9": {
+        "class_type": "SaveImage",
+        "inputs": {
+            "filename_prefix": "boomshakalaka_img2img",
+            "images": ["8", 0]
+        }
+    },
+    # CLIP text encoders read straight from the checkpoint until LoRAs are chained in
+    "6": {
         "class_type": "CLIPTextEncode",
         "inputs": {
-            "text": prompt,
-            "clip": current_clip_source
+            "text": None,
+            "clip": ["4", 1]
         }
-    }
-    workflow["7"] = {
+    },
+    "7": {
         "class_type": "CLIPTextEncode",
         "inputs": {
-            "text": negative_prompt or "",
-            "clip": current_clip_source
+            "text": None,
+            "clip": ["4", 1]
         }
-    }
-
-    # KSampler - uses final model source
-    workflow["3"] = {
+    },
+    # KSampler with denoise setting - uses the encoded image as latent
+    "3": {
         "class_type": "KSampler",
         "inputs": {
-            "seed": seed,
-            "steps": steps,
-            "cfg": cfg_scale,
-            "sampler_name": sampler,
+            "seed": None,
+            "steps": None,
+            "cfg": None,
+            "sampler_name": None,
             "scheduler": "normal",
-            "denoise": 1.0,
-            "model": current_model_source,
+            "denoise": None,  # Key difference from txt2img
+            "model": ["4", 0],
             "positive": ["6", 0],
             "negative": ["7", 0],
-            "latent_image": ["5", 0]
+            "latent_image": ["11", 0]  # Use encoded image instead of empty latent
         }
     }
-
-    return workflow
+}, pickle.HIGHEST_PROTOCOL)
 
 
 def build_img2img_workflow(prompt, negative_prompt, model, image_filename, denoise, seed, steps, cfg_scale, sampler, loras=None):
@@ -4696,122 +5397,33 @@ def build_img2img_workflow(prompt, negative_prompt, model, image_filename, denoi
         denoise: Strength of denoising (0.0 = no change, 1.0 = complete regeneration)
         loras: List of dicts with 'filename' and 'strength' (0.0-2.0)
     """
-    loras = loras or []
-
-    # Base workflow for img2img
-    workflow = {
-        "4": {
-            "class_type": "CheckpointLoaderSimple",
-            "inputs": {
-                "ckpt_name": model
-            }
-        },
-        # Load the input image
-        "10": {
-            "class_type": "LoadImage",
-            "inputs": {
-                "image": image_filename
-            }
-        },
-        # Encode the image to latent space
-        "11": {
-            "class_type": "VAEEncode",
-            "inputs": {
-                "pixels": ["10", 0],
-                "vae": ["4", 2]
-            }
-        },
-        "8": {
-            "class_type": "VAEDecode",
-            "inputs": {
-                "samples": ["3", 0],
-                "vae": ["4", 2]
-            }
-        },
-        "9": {
-            "class_type": "SaveImage",
-            "inputs": {
-                "filename_prefix": "boomshakalaka_img2img",
-                "images": ["8", 0]
-            }
-        }
-    }
+    workflow = pickle.loads(IMG2IMG_TEMPLATE)
+    workflow["4"]["inputs"]["ckpt_name"] = model
+    workflow["10"]["inputs"]["image"] = image_filename
+    workflow["6"]["inputs"]["text"] = prompt
+    workflow["7"]["inputs"]["text"] = negative_prompt or ""
+    sampler_inputs = workflow["3"]["inputs"]
+    sampler_inputs.update(seed=seed, steps=steps, cfg=cfg_scale, sampler_name=sampler, denoise=denoise)
 
-    # Track the current model and clip outputs for chaining LoRAs
-    current_model_source = ["4", 0]
-    current_clip_source = ["4", 1]
+    if loras:
+        chain_loras(workflow, loras)
 
-    # Add LoRA loaders if any are specified
-    for i, lora in enumerate(loras):
-        lora_filename = lora.get('filename', '')
-        lora_strength = float(lora.get('strength', 1.0))
+    return workflow
 
-        if not lora_filename:
-            continue
 
-        node_id = f"lora_{i}"
-        workflow[node_id] = {
-            "class_type": "LoraLoader",
-            "inputs": {
-                "lora_name": lora_filename,
-                "strength_model": lora_strength,
-                "strength_clip": lora_strength,
-                "model": current_model_source,
-                "clip": current_clip_source,
-            }
-        }
-        current_model_source = [node_id, 0]
-        current_clip_source = [node_id, 1]
+def build_video_workflow(prompt, input_image, video_model, model_type, width, height, frames, seed, steps, cfg_scale, motion_strength, gen_id,
+                         negative_prompt=None, fps=24,
+                         # LTX-specific params
+                         strength=None, max_shift=None, base_shift=None, sampler=None,
+                         # Wan-specific params
+                         shift=None, scheduler=None,
+                         # Hunyuan-specific params
+                         embedded_cfg_scale=None,
+                         # Common encoding params
+                         crf=None):
+    """Build a ComfyUI workflow for image-to-video generation.
 
-    # CLIP text encoders
-    workflow["6"] = {
-        "class_type": "CLIPTextEncode",
-        "inputs": {
-            "text": prompt,
-            "clip": current_clip_source
-        }
-    }
-    workflow["7"] = {
-        "class_type": "CLIPTextEncode",
-        "inputs": {
-            "text": negative_prompt or "",
-            "clip": current_clip_source
-        }
-    }
-
-    # KSampler with denoise setting - uses the encoded image as latent
-    workflow["3"] = {
-        "class_type": "KSampler",
-        "inputs": {
-            "seed": seed,
-            "steps": steps,
-            "cfg": cfg_scale,
-            "sampler_name": sampler,
-            "scheduler": "normal",
-            "denoise": denoise,  # Key difference from txt2img
-            "model": current_model_source,
-            "positive": ["6", 0],
-            "negative": ["7", 0],
-            "latent_image": ["11", 0]  # Use encoded image instead of empty latent
-        }
-    }
-
-    return workflow
-
-
-def build_video_workflow(prompt, input_image, video_model, model_type, width, height, frames, seed, steps, cfg_scale, motion_strength, gen_id,
-                         negative_prompt=None, fps=24,
-                         # LTX-specific params
-                         strength=None, max_shift=None, base_shift=None, sampler=None,
-                         # Wan-specific params
-                         shift=None, scheduler=None,
-                         # Hunyuan-specific params
-                         embedded_cfg_scale=None,
-                         # Common encoding params
-                         crf=None):
-    """Build a ComfyUI workflow for image-to-video generation.
-
-    Supports LTX-Video, Wan2.1/2.2, and HunyuanVideo models.
+    Supports LTX-Video, Wan2.1/2.2, and HunyuanVideo models.
 
     Common params:
         negative_prompt: Things to avoid in the video
@@ -4831,80 +5443,171 @@ def build_video_workflow(prompt, input_image, video_model, model_type, width, he
     Hunyuan-specific params:
         embedded_cfg_scale: Secondary guidance scale
     """
-    if model_type == 'ltx':
-        return build_ltx_video_workflow(
-            prompt=prompt,
-            input_image=input_image,
-            video_model=video_model,
-            width=width,
-            height=height,
-            frames=frames,
-            seed=seed,
-            steps=steps,
-            cfg_scale=cfg_scale,
-            gen_id=gen_id,
-            negative_prompt=negative_prompt,
-            strength=strength,
-            max_shift=max_shift,
-            base_shift=base_shift,
-            fps=fps,
-            motion_strength=motion_strength,
-            sampler=sampler,
-            crf=crf,
-        )
-    elif model_type == 'wan':
-        return build_wan_video_workflow(
-            prompt=prompt,
-            input_image=input_image,
-            video_model=video_model,
-            width=width,
-            height=height,
-            frames=frames,
-            seed=seed,
-            steps=steps,
-            cfg_scale=cfg_scale,
-            motion_strength=motion_strength,
-            gen_id=gen_id,
-            shift=shift,
-            scheduler=scheduler,
-            fps=fps,
-            crf=crf,
-        )
-    elif model_type == 'hunyuan':
-        return build_hunyuan_video_workflow(
-            prompt=prompt,
-            input_image=input_image,
-            video_model=video_model,
-            width=width,
-            height=height,
-            frames=frames,
-            seed=seed,
-            steps=steps,
-            cfg_scale=cfg_scale,
-            gen_id=gen_id,
-            negative_prompt=negative_prompt,
-            embedded_cfg_scale=embedded_cfg_scale,
-            fps=fps,
-            crf=crf,
-        )
-    else:
-        # Default to LTX
-        return build_ltx_video_workflow(
-            prompt=prompt,
-            input_image=input_image,
-            video_model=video_model,
-            width=width,
-            height=height,
-            frames=frames,
-            seed=seed,
-            steps=steps,
-            cfg_scale=cfg_scale,
-            gen_id=gen_id,
-            negative_prompt=negative_prompt,
-            fps=fps,
-            sampler=sampler,
-            crf=crf,
-        )
+    params = locals()
+    builder, accepted = VIDEO_WORKFLOW_BUILDERS.get(model_type, DEFAULT_VIDEO_WORKFLOW_BUILDER)
+    return builder(**{name: params[name] for name in accepted})
+
+
+def video_save_node(images_source, **extra_inputs):
+    """Return the VHS_VideoCombine save node shared by the video templates.
+
+    frame_rate, filename_prefix and crf are left as None placeholders for
+    fill_video_save_node(); extra_inputs adds builder-specific options.
+    """
+    return {
+        "class_type": "VHS_VideoCombine",
+        "inputs": {
+            "images": images_source,
+            "frame_rate": None,
+            "loop_count": 0,
+            "filename_prefix": None,
+            "format": "video/h264-mp4",
+            "pix_fmt": "yuv420p",
+            "crf": None,
+            **extra_inputs,
+            "pingpong": False,
+            "save_output": True,
+        }
+    }
+
+
+def fill_video_save_node(node, fps, crf, gen_id):
+    """Set the per-request inputs on a video_save_node() copy."""
+    node["inputs"].update(frame_rate=fps, filename_prefix=f"boomshakalaka_video_{gen_id}", crf=crf)
+
+
+# Static LTX-Video node graph; build_ltx_video_workflow() unpickles a copy per
+# request and fills in the None placeholders
+LTX_VIDEO_TEMPLATE = pickle.dumps({
+    # 1. Load LTX Video model (checkpoint includes model + vae)
+    "1": {
+        "class_type": "CheckpointLoaderSimple",
+        "inputs": {
+            "ckpt_name": None
+        }
+    },
+    # 2. Load T5 CLIP for LTX Video
+    "2": {
+        "class_type": "CLIPLoader",
+        "inputs": {
+            "clip_name": "t5xxl_fp16.safetensors",
+            "type": "ltxv"
+        }
+    },
+    # 3. Load input image
+    "3": {
+        "class_type": "LoadImage",
+        "inputs": {
+            "image": None
+        }
+    },
+    # 4. Encode positive prompt
+    "4": {
+        "class_type": "CLIPTextEncode",
+        "inputs": {
+            "text": None,
+            "clip": ["2", 0]
+        }
+    },
+    # 5. Encode negative prompt
+    "5": {
+        "class_type": "CLIPTextEncode",
+        "inputs": {
+            "text": None,
+            "clip": ["2", 0]
+        }
+    },
+    # 6. LTX Video conditioning (adds frame rate info)
+    "6": {
+        "class_type": "LTXVConditioning",
+        "inputs": {
+            "positive": ["4", 0],
+            "negative": ["5", 0],
+            "frame_rate": None
+        }
+    },
+    # 7. LTX Img to Video - outputs [positive, negative, latent]
+    "7": {
+        "class_type": "LTXVImgToVideo",
+        "inputs": {
+            "positive": ["6", 0],
+            "negative": ["6", 1],
+            "vae": ["1", 2],
+            "image": ["3", 0],
+            "width": None,
+            "height": None,
+            "length": None,
+            "batch_size": 1,
+            "strength": None
+        }
+    },
+    # 8. LTX Scheduler - creates sigmas for sampling
+    "8": {
+        "class_type": "LTXVScheduler",
+        "inputs": {
+            "steps": None,
+            "max_shift": None,
+            "base_shift": None,
+            "stretch": True,
+            "terminal": 0.1,
+            "latent": ["7", 2]
+        }
+    },
+    # 9. Random noise
+    "9": {
+        "class_type": "RandomNoise",
+        "inputs": {
+            "noise_seed": None
+        }
+    },
+    # 10. Sampler select
+    "10": {
+        "class_type": "KSamplerSelect",
+        "inputs": {
+            "sampler_name": None
+        }
+    },
+    # 11. Model sampling LTX (patches model for LTX-specific sampling)
+    "11": {
+        "class_type": "ModelSamplingLTXV",
+        "inputs": {
+            "model": ["1", 0],
+            "max_shift": None,
+            "base_shift": None
+        }
+    },
+    # 12. CFG Guider
+    "12": {
+        "class_type": "CFGGuider",
+        "inputs": {
+            "model": ["11", 0],
+            "positive": ["7", 0],
+            "negative": ["7", 1],
+            "cfg": None
+        }
+    },
+    # 13. SamplerCustomAdvanced - main sampling
+    "13": {
+        "class_type": "SamplerCustomAdvanced",
+        "inputs": {
+            "noise": ["9", 0],
+            "guider": ["12", 0],
+            "sampler": ["10", 0],
+            "sigmas": ["8", 0],
+            "latent_image": ["7", 2]
+        }
+    },
+    # 14. VAE Decode
+    "14": {
+        "class_type": "VAEDecode",
+        "inputs": {
+            "samples": ["13", 0],
+            "vae": ["1", 2]
+        }
+    },
+    # 15. Save video
+    "15": video_save_node(["14", 0], save_metadata=True)
+}, pickle.HIGHEST_PROTOCOL)
 
 
 def build_ltx_video_workflow(prompt, input_image, video_model, width, height, frames, seed, steps, cfg_scale, gen_id,
@@ -4941,289 +5644,233 @@ def build_ltx_video_workflow(prompt, input_image, video_model, width, height, fr
         crf = 19
 
     logger.info("Building LTX video workflow (native nodes):")
-    logger.info(f"  prompt: {prompt[:100]}...")
-    logger.info(f"  input_image: {input_image}")
-    logger.info(f"  video_model: {video_model}")
-    logger.info(f"  dimensions: {width}x{height}")
-    logger.info(f"  frames: {frames}, seed: {seed}, steps: {steps}, cfg: {cfg_scale}")
-    logger.info(f"  strength: {strength}, max_shift: {max_shift}, base_shift: {base_shift}")
-    logger.info(f"  gen_id: {gen_id}")
-
-    workflow = {
-        # 1. Load LTX Video model (checkpoint includes model + vae)
-        "1": {
-            "class_type": "CheckpointLoaderSimple",
-            "inputs": {
-                "ckpt_name": video_model
-            }
-        },
-        # 2. Load T5 CLIP for LTX Video
-        "2": {
-            "class_type": "CLIPLoader",
-            "inputs": {
-                "clip_name": "t5xxl_fp16.safetensors",
-                "type": "ltxv"
-            }
-        },
-        # 3. Load input image
-        "3": {
-            "class_type": "LoadImage",
-            "inputs": {
-                "image": input_image
-            }
-        },
-        # 4. Encode positive prompt
-        "4": {
-            "class_type": "CLIPTextEncode",
-            "inputs": {
-                "text": prompt,
-                "clip": ["2", 0]
-            }
-        },
-        # 5. Encode negative prompt - NOW CONFIGURABLE
-        "5": {
-            "class_type": "CLIPTextEncode",
-            "inputs": {
-                "text": negative_prompt,
-                "clip": ["2", 0]
-            }
-        },
-        # 6. LTX Video conditioning (adds frame rate info)
-        "6": {
-            "class_type": "LTXVConditioning",
-            "inputs": {
-                "positive": ["4", 0],
-                "negative": ["5", 0],
-                "frame_rate": float(fps)
-            }
-        },
-        # 7. LTX Img to Video - outputs [positive, negative, latent]
-        "7": {
-            "class_type": "LTXVImgToVideo",
-            "inputs": {
-                "positive": ["6", 0],
-                "negative": ["6", 1],
-                "vae": ["1", 2],
-                "image": ["3", 0],
-                "width": width,
-                "height": height,
-                "length": frames,
-                "batch_size": 1,
-                "strength": strength  # NOW CONFIGURABLE
-            }
-        },
-        # 8. LTX Scheduler - creates sigmas for sampling
-        "8": {
-            "class_type": "LTXVScheduler",
-            "inputs": {
-                "steps": steps,
-                "max_shift": max_shift,  # NOW CONFIGURABLE
-                "base_shift": base_shift,  # NOW CONFIGURABLE
-                "stretch": True,
-                "terminal": 0.1,
-                "latent": ["7", 2]
-            }
-        },
-        # 9. Random noise
-        "9": {
-            "class_type": "RandomNoise",
-            "inputs": {
-                "noise_seed": seed
-            }
-        },
-        # 10. Sampler select
-        "10": {
-            "class_type": "KSamplerSelect",
-            "inputs": {
-                "sampler_name": sampler  # NOW CONFIGURABLE
-            }
-        },
-        # 11. Model sampling LTX (patches model for LTX-specific sampling)
-        "11": {
-            "class_type": "ModelSamplingLTXV",
-            "inputs": {
-                "model": ["1", 0],
-                "max_shift": max_shift,  # NOW CONFIGURABLE
-                "base_shift": base_shift  # NOW CONFIGURABLE
-            }
-        },
-        # 12. CFG Guider
-        "12": {
-            "class_type": "CFGGuider",
-            "inputs": {
-                "model": ["11", 0],
-                "positive": ["7", 0],
-                "negative": ["7", 1],
-                "cfg": cfg_scale
-            }
-        },
-        # 13. SamplerCustomAdvanced - main sampling
-        "13": {
-            "class_type": "SamplerCustomAdvanced",
-            "inputs": {
-                "noise": ["9", 0],
-                "guider": ["12", 0],
-                "sampler": ["10", 0],
-                "sigmas": ["8", 0],
-                "latent_image": ["7", 2]
-            }
-        },
-        # 14. VAE Decode
-        "14": {
-            "class_type": "VAEDecode",
-            "inputs": {
-                "samples": ["13", 0],
-                "vae": ["1", 2]
-            }
-        },
-        # 15. Save video
-        "15": {
-            "class_type": "VHS_VideoCombine",
-            "inputs": {
-                "images": ["14", 0],
-                "frame_rate": fps,  # NOW CONFIGURABLE
-                "loop_count": 0,
-                "filename_prefix": f"boomshakalaka_video_{gen_id}",
-                "format": "video/h264-mp4",
-                "pix_fmt": "yuv420p",
-                "crf": crf,  # NOW CONFIGURABLE
-                "save_metadata": True,
-                "pingpong": False,
-                "save_output": True
-            }
-        }
-    }
-
-    logger.info(f"LTX workflow built with {len(workflow)} nodes: {list(workflow.keys())}")
+    logger.info("  prompt: %s...", prompt[:100])
+    logger.info("  input_image: %s", input_image)
+    logger.info("  video_model: %s", video_model)
+    logger.info("  dimensions: %sx%s", width, height)
+    logger.info("  frames: %s, seed: %s, steps: %s, cfg: %s", frames, seed, steps, cfg_scale)
+    logger.info("  strength: %s, max_shift: %s, base_shift: %s", strength, max_shift, base_shift)
+    logger.info("  gen_id: %s", gen_id)
+
+    workflow = pickle.loads(LTX_VIDEO_TEMPLATE)
+    workflow["1"]["inputs"]["ckpt_name"] = video_model
+    workflow["3"]["inputs"]["image"] = input_image
+    workflow["4"]["inputs"]["text"] = prompt
+    workflow["5"]["inputs"]["text"] = negative_prompt
+    workflow["6"]["inputs"]["frame_rate"] = float(fps)
+    workflow["7"]["inputs"].update(width=width, height=height, length=frames, strength=strength)
+    workflow["8"]["inputs"].update(steps=steps, max_shift=max_shift, base_shift=base_shift)
+    workflow["9"]["inputs"]["noise_seed"] = seed
+    workflow["10"]["inputs"]["sampler_name"] = sampler
+    workflow["11"]["inputs"].update(max_shift=max_shift, base_shift=base_shift)
+    workflow["12"]["inputs"]["cfg"] = cfg_scale
+    fill_video_save_node(workflow["15"], fps, crf, gen_id)
+
+    logger.info("LTX workflow built with %s nodes: %s", len(workflow), list(workflow.keys()))
     return workflow
 
 
-def build_wan_video_workflow(prompt, input_image, video_model, width, height, frames, seed, steps, cfg_scale, motion_strength, gen_id, shift=None, scheduler=None, fps=24, crf=None):
-    """Build workflow for Wan2.x image-to-video generation using ComfyUI-WanVideoWrapper.
-
-    Args:
-        motion_strength: 0.0-1.0, controls amount of motion (higher = more movement)
-        shift: Sampling shift parameter (default 5.0)
-        scheduler: Sampling scheduler - 'unipc', 'euler', or 'ddim'
-        fps: Output video frame rate
-        crf: Video quality (lower = better, default 19)
-    """
-    # Apply defaults for optional params
-    if shift is None:
-        shift = 5.0
-    if scheduler is None:
-        scheduler = "unipc"
-    if crf is None:
-        crf = 19
+# Static Wan2.x node graph; build_wan_video_workflow() unpickles a copy per
+# request and fills in the None placeholders. The loader nodes ("1"-"4") keep
+# the same ids and inputs on every request, so ComfyUI's execution cache reuses
+# the loaded T5, CLIP vision, model and VAE across back-to-back jobs.
+WAN_VIDEO_TEMPLATE = pickle.dumps({
+    # Load text encoder
+    "1": {
+        "class_type": "DownloadAndLoadWanT5TextEncoder",
+        "inputs": {
+            "model": "umt5-xxl-enc-fp8_e4m3fn.safetensors",
+            "precision": "fp8_e4m3fn"
+        }
+    },
+    # Load CLIP vision
+    "2": {
+        "class_type": "DownloadAndLoadWanClipVision",
+        "inputs": {
+            "model": "open-clip-xlm-roberta-large-vit-huge-14_visual_fp16.safetensors",
+            "precision": "fp16"
+        }
+    },
+    # Load main video model
+    "3": {
+        "class_type": "DownloadAndLoadWanModel",
+        "inputs": {
+            "model": None,
+            "precision": "fp8_scaled",
+            "quantization": "disabled",
+        }
+    },
+    # Load VAE
+    "4": {
+        "class_type": "DownloadAndLoadWanVAE",
+        "inputs": {
+            "model": "Wan2_2_VAE_bf16.safetensors",
+            "precision": "bf16"
+        }
+    },
+    # Load input image
+    "5": {
+        "class_type": "LoadImage",
+        "inputs": {
+            "image": None
+        }
+    },
+    # Encode text
+    "6": {
+        "class_type": "WanTextEncode",
+        "inputs": {
+            "text_encoder": ["1", 0],
+            "prompt": None,
+        }
+    },
+    # Encode image with CLIP
+    "7": {
+        "class_type": "WanClipVisionEncode",
+        "inputs": {
+            "clip_vision": ["2", 0],
+            "image": ["5", 0],
+        }
+    },
+    # Sample video - motion_strength affects shift and cfg
+    "8": {
+        "class_type": "WanSampler",
+        "inputs": {
+            "model": ["3", 0],
+            "positive": ["6", 0],
+            "image_embeds": ["7", 0],
+            "width": None,
+            "height": None,
+            "num_frames": None,
+            "seed": None,
+            "steps": None,
+            "cfg": None,
+            "shift": None,
+            "scheduler": None,
+        }
+    },
+    # Decode with VAE
+    "9": {
+        "class_type": "WanVAEDecode",
+        "inputs": {
+            "vae": ["4", 0],
+            "latent": ["8", 0],
+        }
+    },
+    # Save video
+    "10": video_save_node(["9", 0])
+}, pickle.HIGHEST_PROTOCOL)
 
-    # Motion strength affects the shift parameter - higher motion = higher shift
-    # Also affects cfg - lower cfg with higher motion for more dynamic results
-    effective_shift = shift * (0.8 + motion_strength * 0.4)  # Range: 0.8x to 1.2x of base shift
-    effective_cfg = cfg_scale * (1.0 - motion_strength * 0.2)  # Slightly reduce cfg for more motion
 
-    workflow = {
-        # Load text encoder
-        "1": {
-            "class_type": "DownloadAndLoadWanT5TextEncoder",
-            "inputs": {
-                "model": "umt5-xxl-enc-fp8_e4m3fn.safetensors",
-                "precision": "fp8_e4m3fn"
-            }
-        },
-        # Load CLIP vision
-        "2": {
-            "class_type": "DownloadAndLoadWanClipVision",
-            "inputs": {
-                "model": "open-clip-xlm-roberta-large-vit-huge-14_visual_fp16.safetensors",
-                "precision": "fp16"
-            }
-        },
-        # Load main video model
-        "3": {
-            "class_type": "DownloadAndLoadWanModel",
-            "inputs": {
-                "model": video_model,
-                "precision": "fp8_scaled",
-                "quantization": "disabled",
-            }
-        },
-        # Load VAE
-        "4": {
-            "class_type": "DownloadAndLoadWanVAE",
-            "inputs": {
-                "model": "Wan2_2_VAE_bf16.safetensors",
-                "precision": "bf16"
-            }
-        },
-        # Load input image
-        "5": {
-            "class_type": "LoadImage",
-            "inputs": {
-                "image": input_image
-            }
-        },
-        # Encode text
-        "6": {
-            "class_type": "WanTextEncode",
-            "inputs": {
-                "text_encoder": ["1", 0],
-                "prompt": prompt,
-            }
-        },
-        # Encode image with CLIP
-        "7": {
-            "class_type": "WanClipVisionEncode",
-            "inputs": {
-                "clip_vision": ["2", 0],
-                "image": ["5", 0],
-            }
-        },
-        # Sample video - motion_strength now affects shift and cfg
-        "8": {
-            "class_type": "WanSampler",
-            "inputs": {
-                "model": ["3", 0],
-                "positive": ["6", 0],
-                "image_embeds": ["7", 0],
-                "width": width,
-                "height": height,
-                "num_frames": frames,
-                "seed": seed,
-                "steps": steps,
-                "cfg": effective_cfg,
-                "shift": effective_shift,
-                "scheduler": scheduler,
-            }
-        },
-        # Decode with VAE
-        "9": {
-            "class_type": "WanVAEDecode",
-            "inputs": {
-                "vae": ["4", 0],
-                "latent": ["8", 0],
-            }
-        },
-        # Save video
-        "10": {
-            "class_type": "VHS_VideoCombine",
-            "inputs": {
-                "images": ["9", 0],
-                "frame_rate": fps,
-                "loop_count": 0,
-                "filename_prefix": f"boomshakalaka_video_{gen_id}",
-                "format": "video/h264-mp4",
-                "pix_fmt": "yuv420p",
-                "crf": crf,  # NOW CONFIGURABLE
-                "pingpong": False,
-                "save_output": True,
-            }
-        }
-    }
+def build_wan_video_workflow(prompt, input_image, video_model, width, height, frames, seed, steps, cfg_scale, motion_strength, gen_id, shift=None, scheduler=None, fps=24, crf=None):
+    """Build workflow for Wan2.x image-to-video generation using ComfyUI-WanVideoWrapper.
+
+    Args:
+        motion_strength: 0.0-1.0, controls amount of motion (higher = more movement)
+        shift: Sampling shift parameter (default 5.0)
+        scheduler: Sampling scheduler - 'unipc', 'euler', or 'ddim'
+        fps: Output video frame rate
+        crf: Video quality (lower = better, default 19)
+    """
+    # Apply defaults for optional params
+    if shift is None:
+        shift = 5.0
+    if scheduler is None:
+        scheduler = "unipc"
+    if crf is None:
+        crf = 19
 
-    logger.info(f"Wan workflow built: motion_strength={motion_strength}, effective_shift={effective_shift:.2f}, effective_cfg={effective_cfg:.2f}, crf={crf}")
+    # Motion strength affects the shift parameter - higher motion = higher shift
+    # Also affects cfg - lower cfg with higher motion for more dynamic results
+    effective_shift = shift * (0.8 + motion_strength * 0.4)  # Range: 0.8x to 1.2x of base shift
+    effective_cfg = cfg_scale * (1.0 - motion_strength * 0.2)  # Slightly reduce cfg for more motion
+
+    workflow = pickle.loads(WAN_VIDEO_TEMPLATE)
+    workflow["3"]["inputs"]["model"] = video_model
+    workflow["5"]["inputs"]["image"] = input_image
+    workflow["6"]["inputs"]["prompt"] = prompt
+    workflow["8"]["inputs"].update(
+        width=width, height=height, num_frames=frames, seed=seed, steps=steps,
+        cfg=effective_cfg, shift=effective_shift, scheduler=scheduler,
+    )
+    fill_video_save_node(workflow["10"], fps, crf, gen_id)
+
+    logger.info("Wan workflow built: motion_strength=%s, effective_shift=%.2f, effective_cfg=%.2f, crf=%s", motion_strength, effective_shift, effective_cfg, crf)
     return workflow
 
 
+# Static HunyuanVideo node graph; build_hunyuan_video_workflow() unpickles a
+# copy per request and fills in the None placeholders. As with Wan, the loader
+# nodes ("1"-"3") are identical between requests for the same model so ComfyUI
+# serves them from its cache.
+HUNYUAN_VIDEO_TEMPLATE = pickle.dumps({
+    # Load HunyuanVideo model
+    "1": {
+        "class_type": "HyVideoModelLoader",
+        "inputs": {
+            "model": None,
+            "precision": "fp16",
+        }
+    },
+    # Load text encoder
+    "2": {
+        "class_type": "HyVideoTextEncoderLoader",
+        "inputs": {
+            "llm_model": "llava_llama3_fp8_scaled.safetensors",
+            "clip_model": "clip_l.safetensors",
+        }
+    },
+    # Load VAE
+    "3": {
+        "class_type": "HyVideoVAELoader",
+        "inputs": {
+            "vae_name": "hunyuan_video_vae_bf16.safetensors",
+        }
+    },
+    # Load input image
+    "4": {
+        "class_type": "LoadImage",
+        "inputs": {
+            "image": None
+        }
+    },
+    # Encode prompt
+    "5": {
+        "class_type": "HyVideoTextEncode",
+        "inputs": {
+            "text_encoder": ["2", 0],
+            "prompt": None,
+        }
+    },
+    # Image to video sampling
+    "6": {
+        "class_type": "HyVideoI2VSampler",
+        "inputs": {
+            "model": ["1", 0],
+            "positive": ["5", 0],
+            "image": ["4", 0],
+            "vae": ["3", 0],
+            "width": None,
+            "height": None,
+            "num_frames": None,
+            "seed": None,
+            "steps": None,
+            "cfg": None,
+            "embedded_cfg_scale": None,
+        }
+    },
+    # Decode video
+    "7": {
+        "class_type": "HyVideoVAEDecode",
+        "inputs": {
+            "vae": ["3", 0],
+            "latent": ["6", 0],
+        }
+    },
+    # Save video
+    "8": video_save_node(["7", 0])
+}, pickle.HIGHEST_PROTOCOL)
+
+
 def build_hunyuan_video_workflow(prompt, input_image, video_model, width, height, frames, seed, steps, cfg_scale, gen_id,
                                   negative_prompt=None, embedded_cfg_scale=None, fps=24, crf=None):
     """Build workflow for HunyuanVideo image-to-video generation.
@@ -5242,92 +5889,255 @@ def build_hunyuan_video_workflow(prompt, input_image, video_model, width, height
     if crf is None:
         crf = 19
 
-    workflow = {
-        # Load HunyuanVideo model
-        "1": {
-            "class_type": "HyVideoModelLoader",
-            "inputs": {
-                "model": video_model,
-                "precision": "fp16",
-            }
-        },
-        # Load text encoder
-        "2": {
-            "class_type": "HyVideoTextEncoderLoader",
-            "inputs": {
-                "llm_model": "llava_llama3_fp8_scaled.safetensors",
-                "clip_model": "clip_l.safetensors",
-            }
-        },
-        # Load VAE
-        "3": {
-            "class_type": "HyVideoVAELoader",
-            "inputs": {
-                "vae_name": "hunyuan_video_vae_bf16.safetensors",
-            }
-        },
-        # Load input image
-        "4": {
-            "class_type": "LoadImage",
-            "inputs": {
-                "image": input_image
-            }
-        },
-        # Encode prompt
-        "5": {
-            "class_type": "HyVideoTextEncode",
-            "inputs": {
-                "text_encoder": ["2", 0],
-                "prompt": prompt,
-            }
-        },
-        # Image to video sampling
-        "6": {
-            "class_type": "HyVideoI2VSampler",
-            "inputs": {
-                "model": ["1", 0],
-                "positive": ["5", 0],
-                "image": ["4", 0],
-                "vae": ["3", 0],
-                "width": width,
-                "height": height,
-                "num_frames": frames,
-                "seed": seed,
-                "steps": steps,
-                "cfg": cfg_scale,
-                "embedded_cfg_scale": embedded_cfg_scale,
-            }
-        },
-        # Decode video
-        "7": {
-            "class_type": "HyVideoVAEDecode",
-            "inputs": {
-                "vae": ["3", 0],
-                "latent": ["6", 0],
-            }
-        },
-        # Save video
-        "8": {
-            "class_type": "VHS_VideoCombine",
-            "inputs": {
-                "images": ["7", 0],
-                "frame_rate": fps,
-                "loop_count": 0,
-                "filename_prefix": f"boomshakalaka_video_{gen_id}",
-                "format": "video/h264-mp4",
-                "pix_fmt": "yuv420p",
-                "crf": crf,  # NOW CONFIGURABLE
-                "pingpong": False,
-                "save_output": True,
-            }
-        }
-    }
+    workflow = pickle.loads(HUNYUAN_VIDEO_TEMPLATE)
+    workflow["1"]["inputs"]["model"] = video_model
+    workflow["4"]["inputs"]["image"] = input_image
+    workflow["5"]["inputs"]["prompt"] = prompt
+    workflow["6"]["inputs"].update(
+        width=width, height=height, num_frames=frames, seed=seed, steps=steps,
+        cfg=cfg_scale, embedded_cfg_scale=embedded_cfg_scale,
+    )
+    fill_video_save_node(workflow["8"], fps, crf, gen_id)
 
-    logger.info(f"Hunyuan workflow built: embedded_cfg_scale={embedded_cfg_scale}, fps={fps}, crf={crf}")
+    logger.info("Hunyuan workflow built: embedded_cfg_scale=%s, fps=%s, crf=%s", embedded_cfg_scale, fps, crf)
     return workflow
 
 
-def send_to_comfyui(workflow, gen_id, batch_size=1, max_wait=300):
+# build_video_workflow() dispatch: model_type -> (builder, parameters it accepts)
+VIDEO_WORKFLOW_BUILDERS = {
+    'ltx': (build_ltx_video_workflow, frozenset({
+        'prompt', 'input_image', 'video_model', 'width', 'height', 'frames', 'seed', 'steps', 'cfg_scale',
+        'gen_id', 'negative_prompt', 'strength', 'max_shift', 'base_shift', 'fps', 'motion_strength',
+        'sampler', 'crf',
+    })),
+    'wan': (build_wan_video_workflow, frozenset({
+        'prompt', 'input_image', 'video_model', 'width', 'height', 'frames', 'seed', 'steps', 'cfg_scale',
+        'motion_strength', 'gen_id', 'shift', 'scheduler', 'fps', 'crf',
+    })),
+    'hunyuan': (build_hunyuan_video_workflow, frozenset({
+        'prompt', 'input_image', 'video_model', 'width', 'height', 'frames', 'seed', 'steps', 'cfg_scale',
+        'gen_id', 'negative_prompt', 'embedded_cfg_scale', 'fps', 'crf',
+    })),
+}
+# Unknown model types fall back to LTX with its own defaults for the tuning params
+DEFAULT_VIDEO_WORKFLOW_BUILDER = (build_ltx_video_workflow, frozenset({
+    'prompt', 'input_image', 'video_model', 'width', 'height', 'frames', 'seed', 'steps', 'cfg_scale',
+    'gen_id', 'negative_prompt', 'fps', 'sampler', 'crf',
+}))
+
+
+def fast_copy(src, dst):
+    """Copy src to dst inside the kernel, keeping metadata like shutil.copy2.
+
+    Uses os.copy_file_range (which can reflink on CoW filesystems) and falls
+    back to shutil.copyfile where it is unavailable or unsupported.
+    """
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if not copied:
+                    break
+                remaining -= copied
+    except (AttributeError, OSError):
+        shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+
+
+def link_or_copy(src, dst):
+    """Hardlink dst to src, copying with fast_copy() when a link is not possible.
+
+    The link or copy is made under a temp name next to dst and renamed over
+    it, so an existing dst (a re-saved generation) is replaced rather than
+    truncated in place; truncating it would also empty src if the two were
+    already hardlinked.
+    """
+    dst = os.fspath(dst)
+    try:
+        if os.path.samefile(src, dst):
+            return
+    except OSError:
+        pass
+
+    tmp_path = f'{dst}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        try:
+            os.link(src, tmp_path)
+        except OSError:
+            fast_copy(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# Worker pool for moving ComfyUI output files into GENERATIONS_DIR
+comfy_io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='comfy-io')
+
+
+def materialize_comfy_image(img, idx, gen_id, batch_size, date_dir):
+    """Link one ComfyUI output image into the batch's dated generations directory.
+
+    Returns the image entry for send_to_comfyui's result, or None if the
+    source file is missing.
+    """
+    filename = img.get('filename')
+    subfolder = img.get('subfolder', '')
+    logger.info("Image %s: %s, subfolder: %s", idx, filename, subfolder)
+
+    # Copy the image to our generations directory
+    src_path = os.path.join(COMFY_OUTPUT_DIR_STR, subfolder, filename)
+    exists = os.path.exists(src_path)
+    logger.info("Source path: %s, exists: %s", src_path, exists)
+    if not exists:
+        return None
+
+    # Generate unique ID for each image in batch
+    img_gen_id = f"{gen_id}_{idx}" if batch_size > 1 else gen_id
+
+    # Link (or copy) into our directory
+    dst_path = date_dir / f'{img_gen_id}_full.png'
+    link_or_copy(src_path, dst_path)
+    logger.info("Saved to %s", dst_path)
+
+    # Also create a simple version in root for easy access
+    simple_dst = GENERATIONS_DIR / f'{img_gen_id}.png'
+    link_or_copy(dst_path, simple_dst)
+    logger.info("Saved to %s", simple_dst)
+
+    return {
+        'id': img_gen_id,
+        'url': f'/api/ai/image/{img_gen_id}',
+        'output_path': str(dst_path),
+        'filename': filename
+    }
+
+
+# Node classes whose outputs send_to_comfyui collects
+COMFY_SAVE_NODE_CLASSES = frozenset({'SaveImage', 'VHS_VideoCombine'})
+
+# Backoff bounds (seconds) for polling /history when the WebSocket is unavailable
+COMFY_POLL_MIN_DELAY = 0.1
+COMFY_POLL_MAX_DELAY = 2.0
+
+# ComfyUI WebSocket events that mean a prompt has stopped executing
+COMFY_PROMPT_DONE_EVENTS = ('execution_success', 'execution_error', 'execution_interrupted')
+
+
+def wait_for_comfy_prompt(comfy_ws, prompt_id, max_wait):
+    """Block on the ComfyUI WebSocket until prompt_id stops executing.
+
+    Returns True once ComfyUI reports the prompt finished (or failed), False
+    if max_wait seconds pass first. Binary preview frames are skipped.
+    """
+    deadline = time.monotonic() + max_wait
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        comfy_ws.settimeout(remaining)
+        try:
+            raw = comfy_ws.recv()
+        except ws_client.WebSocketTimeoutException:
+            return False
+        if not isinstance(raw, str):
+            continue
+
+        msg = fast_json_loads(raw)
+        data = msg.get('data') or {}
+        if data.get('prompt_id') != prompt_id:
+            continue
+        msg_type = msg.get('type')
+        if msg_type == 'executing' and data.get('node') is None:
+            return True
+        if msg_type in COMFY_PROMPT_DONE_EVENTS:
+            return True
+
+
+def collect_comfy_outputs(workflow, outputs, gen_id, batch_size=1, save_node_id=None):
+    """Turn a finished prompt's /history outputs into send_to_comfyui's result.
+
+    Image outputs are linked into GENERATIONS_DIR; video outputs are returned
+    by path, as ComfyUI wrote them. When the builder's save node id is known
+    its output is read directly.
+    """
+    if save_node_id in outputs:
+        node_items = ((save_node_id, outputs[save_node_id]),)
+    else:
+        # Find the workflow's save nodes; only scan every output when none
+        # of them reported anything
+        node_items = [
+            (node_id, outputs[node_id])
+            for node_id, node in workflow.items()
+            if node.get('class_type') in COMFY_SAVE_NODE_CLASSES and node_id in outputs
+        ] or outputs.items()
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
+    # Find the SaveImage output - collect ALL images for batch support
+    images_result = []
+    for node_id, node_output in node_items:
+        logger.info("Node %s output keys: %s", node_id, list(node_output.keys()))
+        if debug_enabled:
+            logger.debug("Node %s full output: %s", node_id, fast_json_dumps(node_output).decode()[:500])
+
+        images = node_output.get('images')
+        if images:
+            logger.info("Found %s images in node %s", len(images), node_id)
+            # Create the date-based directory once for the whole batch
+            now = datetime.now()
+            date_dir = GENERATIONS_DIR / f'{now.year:04d}/{now.month:02d}/{now.day:02d}'
+            date_dir.mkdir(parents=True, exist_ok=True)
+
+            # Link/copy the batch concurrently, keeping batch order
+            futures = [
+                comfy_io_pool.submit(materialize_comfy_image, img, idx, gen_id, batch_size, date_dir)
+                for idx, img in enumerate(images)
+            ]
+            images_result.extend(
+                result for result in (f.result() for f in futures) if result
+            )
+
+            # If we found images, return them all
+            if images_result:
+                logger.info("Returning %s images", len(images_result))
+                return {'images': images_result}
+
+        # Check for video outputs (gifs/videos from VHS_VideoCombine)
+        # VHS_VideoCombine uses 'gifs' key even for mp4 output
+        gifs = node_output.get('gifs')
+        if gifs:
+            logger.info("Found gifs/video in node %s: %s", node_id, gifs)
+            for vid in gifs:
+                filename = vid.get('filename')
+                subfolder = vid.get('subfolder', '')
+                logger.info("Video file: %s, subfolder: %s", filename, subfolder)
+                return {
+                    'output_path': str(COMFY_DIR / 'output' / subfolder / filename),
+                    'filename': filename,
+                    'is_video': True
+                }
+        videos = node_output.get('videos')
+        if videos:
+            logger.info("Found videos in node %s: %s", node_id, videos)
+            for vid in videos:
+                filename = vid.get('filename')
+                subfolder = vid.get('subfolder', '')
+                logger.info("Video file: %s, subfolder: %s", filename, subfolder)
+                return {
+                    'output_path': str(COMFY_DIR / 'output' / subfolder / filename),
+                    'filename': filename,
+                    'is_video': True
+                }
+
+    logger.warning("No images or videos found in any output node")
+    return {'error': 'No images or videos in output'}
+
+
+def send_to_comfyui(workflow, gen_id, batch_size=1, max_wait=300, save_node_id=None):
     """Send a workflow to ComfyUI and wait for the result.
 
     Args:
@@ -5335,174 +6145,133 @@ def send_to_comfyui(workflow, gen_id, batch_size=1, max_wait=300):
         gen_id: Base generation ID
         batch_size: Expected number of images (for multi-image batches)
         max_wait: Maximum wait time in seconds (default 300 = 5 min, use 1800 for video)
+        save_node_id: Id of the workflow's save node, if known (see IMAGE_SAVE_NODE_ID)
 
     Returns:
         dict with 'images' array containing all generated images, or 'error'
     """
-    import httpx
-    import time
+    logger.info("send_to_comfyui called for gen_id: %s, batch_size: %s, max_wait: %ss", gen_id, batch_size, max_wait)
 
-    logger.info(f"send_to_comfyui called for gen_id: {gen_id}, batch_size: {batch_size}, max_wait: {max_wait}s")
+    # Subscribe to ComfyUI's event stream before queueing so the completion
+    # event cannot be missed; fall back to polling /history if it is unavailable
+    client_id = uuid.uuid4().hex
+    comfy_ws = None
+    try:
+        comfy_ws = ws_client.create_connection(
+            f'ws://{COMFY_HOST}:{COMFY_PORT}/ws?clientId={client_id}',
+            timeout=10
+        )
+    except Exception as e:
+        logger.warning("ComfyUI WebSocket unavailable, falling back to polling: %s", e)
 
     try:
         # Queue the prompt
-        logger.info(f"Posting to ComfyUI at http://{COMFY_HOST}:{COMFY_PORT}/prompt")
-        logger.debug(f"Workflow has {len(workflow)} nodes: {list(workflow.keys())}")
-
-        response = httpx.post(
-            f'http://{COMFY_HOST}:{COMFY_PORT}/prompt',
-            json={'prompt': workflow},
+        logger.info("Posting to ComfyUI at http://%s:%s/prompt", COMFY_HOST, COMFY_PORT)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Workflow has %s nodes: %s", len(workflow), list(workflow.keys()))
+
+        submitted_at = time.monotonic()
+        response = comfy_client.post(
+            '/prompt',
+            content=fast_json_dumps({'prompt': workflow, 'client_id': client_id}),
+            headers={'Content-Type': 'application/json'},
             timeout=30
         )
 
-        logger.info(f"ComfyUI prompt response status: {response.status_code}")
-        logger.debug(f"Response body: {response.text[:1000] if len(response.text) > 1000 else response.text}")
+        logger.info("ComfyUI prompt response status: %s", response.status_code)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Response body: %s", response.text[:1000])
 
         if response.status_code != 200:
-            logger.error(f"ComfyUI returned non-200 status: {response.status_code}")
+            logger.error("ComfyUI returned non-200 status: %s", response.status_code)
             return {'error': f'ComfyUI error: {response.text}'}
 
-        data = response.json()
+        data = fast_json_loads(response.content)
         prompt_id = data.get('prompt_id')
-        logger.info(f"Prompt ID: {prompt_id}")
+        logger.info("Prompt ID: %s", prompt_id)
 
         if not prompt_id:
             logger.error("No prompt_id in response")
             return {'error': 'No prompt ID returned'}
 
-        # Poll for completion
-        poll_interval = 1
-        elapsed = 0
-
-        logger.info(f"Polling for completion (max {max_wait}s)...")
-
-        while elapsed < max_wait:
-            time.sleep(poll_interval)
-            elapsed += poll_interval
+        # Wait for ComfyUI to report completion over the WebSocket
+        ws_finished = False
+        if comfy_ws is not None:
+            logger.info("Waiting for completion event (max %ss)...", max_wait)
+            try:
+                ws_finished = wait_for_comfy_prompt(comfy_ws, prompt_id, max_wait)
+                if not ws_finished:
+                    logger.error("Generation timed out after %ss", max_wait)
+                    return {'error': 'Generation timed out'}
+            except Exception as e:
+                logger.warning("ComfyUI WebSocket failed, falling back to polling: %s", e)
+
+        # Fetch the outputs from history. After a completion event the first
+        # fetch already has them; otherwise this polls with exponential backoff
+        # so short jobs are picked up quickly without hammering ComfyUI.
+        deadline = submitted_at + max_wait
+        poll_delay = COMFY_POLL_MIN_DELAY
+        skip_sleep = ws_finished
+        last_log = time.monotonic()
+
+        if not ws_finished:
+            logger.info("Polling for completion (max %ss)...", max_wait)
+
+        while time.monotonic() < deadline:
+            if skip_sleep:
+                skip_sleep = False
+            else:
+                time.sleep(poll_delay)
+                poll_delay = min(poll_delay * 1.5, COMFY_POLL_MAX_DELAY)
 
             # Check history
-            history_response = httpx.get(
-                f'http://{COMFY_HOST}:{COMFY_PORT}/history/{prompt_id}',
-                timeout=10
-            )
+            history_response = comfy_client.get(f'/history/{prompt_id}')
 
-            if elapsed % 10 == 0:  # Log every 10 seconds
-                logger.debug(f"Polling at {elapsed}s - status: {history_response.status_code}")
+            now = time.monotonic()
+            if now - last_log >= 10:  # Log every 10 seconds
+                logger.debug("Polling at %.0fs - status: %s", now - submitted_at, history_response.status_code)
+                last_log = now
 
             if history_response.status_code == 200:
-                history = history_response.json()
+                history = fast_json_loads(history_response.content)
                 if prompt_id in history:
-                    logger.info(f"Found in history at {elapsed}s")
+                    logger.info("Found in history at %.1fs", now - submitted_at)
                     outputs = history[prompt_id].get('outputs', {})
-                    logger.info(f"Output node IDs: {list(outputs.keys())}")
-
-                    # Log all outputs for debugging
-                    for node_id, node_output in outputs.items():
-                        logger.info(f"Node {node_id} output keys: {list(node_output.keys())}")
-                        logger.debug(f"Node {node_id} full output: {json.dumps(node_output, indent=2)[:500]}")
-
-                    # Find the SaveImage output - collect ALL images for batch support
-                    images_result = []
-                    for node_id, node_output in outputs.items():
-                        if 'images' in node_output:
-                            logger.info(f"Found {len(node_output['images'])} images in node {node_id}")
-                            for idx, img in enumerate(node_output['images']):
-                                filename = img.get('filename')
-                                subfolder = img.get('subfolder', '')
-                                logger.info(f"Image {idx}: {filename}, subfolder: {subfolder}")
-
-                                # Copy the image to our generations directory
-                                src_path = COMFY_DIR / 'output' / subfolder / filename
-                                logger.info(f"Source path: {src_path}, exists: {src_path.exists()}")
-
-                                if src_path.exists():
-                                    # Create date-based directory
-                                    date_dir = GENERATIONS_DIR / datetime.now().strftime('%Y/%m/%d')
-                                    date_dir.mkdir(parents=True, exist_ok=True)
-
-                                    # Generate unique ID for each image in batch
-                                    img_gen_id = f"{gen_id}_{idx}" if batch_size > 1 else gen_id
-
-                                    # Copy to our directory
-                                    dst_path = date_dir / f'{img_gen_id}_full.png'
-                                    import shutil
-                                    shutil.copy2(str(src_path), str(dst_path))
-                                    logger.info(f"Copied to {dst_path}")
-
-                                    # Also create a simple version in root for easy access
-                                    simple_dst = GENERATIONS_DIR / f'{img_gen_id}.png'
-                                    shutil.copy2(str(src_path), str(simple_dst))
-                                    logger.info(f"Copied to {simple_dst}")
-
-                                    images_result.append({
-                                        'id': img_gen_id,
-                                        'url': f'/api/ai/image/{img_gen_id}',
-                                        'output_path': str(dst_path),
-                                        'filename': filename
-                                    })
-
-                            # If we found images, return them all
-                            if images_result:
-                                logger.info(f"Returning {len(images_result)} images")
-                                return {'images': images_result}
-
-                        # Check for video outputs (gifs/videos from VHS_VideoCombine)
-                        # VHS_VideoCombine uses 'gifs' key even for mp4 output
-                        if 'gifs' in node_output:
-                            logger.info(f"Found gifs/video in node {node_id}: {node_output['gifs']}")
-                            for vid in node_output['gifs']:
-                                filename = vid.get('filename')
-                                subfolder = vid.get('subfolder', '')
-                                logger.info(f"Video file: {filename}, subfolder: {subfolder}")
-                                return {
-                                    'output_path': str(COMFY_DIR / 'output' / subfolder / filename),
-                                    'filename': filename,
-                                    'is_video': True
-                                }
-                        if 'videos' in node_output:
-                            logger.info(f"Found videos in node {node_id}: {node_output['videos']}")
-                            for vid in node_output['videos']:
-                                filename = vid.get('filename')
-                                subfolder = vid.get('subfolder', '')
-                                logger.info(f"Video file: {filename}, subfolder: {subfolder}")
-                                return {
-                                    'output_path': str(COMFY_DIR / 'output' / subfolder / filename),
-                                    'filename': filename,
-                                    'is_video': True
-                                }
-
-                    logger.warning("No images or videos found in any output node")
-                    return {'error': 'No images or videos in output'}
-
-        logger.error(f"Generation timed out after {max_wait}s")
+                    logger.info("Output node IDs: %s", list(outputs.keys()))
+
+                    return collect_comfy_outputs(workflow, outputs, gen_id, batch_size, save_node_id)
+
+        logger.error("Generation timed out after %ss", max_wait)
         return {'error': 'Generation timed out'}
 
     except Exception as e:
-        logger.error(f"Exception in send_to_comfyui: {e}")
+        logger.error("Exception in send_to_comfyui: %s", e)
         import traceback
         logger.error(traceback.format_exc())
         return {'error': str(e)}
 
+    finally:
+        if comfy_ws is not None:
+            comfy_ws.close()
 
-def save_generation(gen_id, prompt, negative_prompt, model, width, height, seed, steps, cfg_scale, sampler, output_path, workflow_json, thumbnail_path=None):
-    """Save generation metadata to database."""
-    import sqlite3
 
-    db_path = DATABASES_DIR / 'generations.db'
-    conn = sqlite3.connect(str(db_path))
+# Use INSERT OR REPLACE to handle re-saving the same generation
+GENERATION_INSERT_SQL = '''
+    INSERT OR REPLACE INTO generations (id, prompt, negative_prompt, model, width, height, seed, steps, cfg_scale, sampler, output_path, thumbnail_path, workflow_json)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
 
+
+def save_generation(gen_id, prompt, negative_prompt, model, width, height, seed, steps, cfg_scale, sampler, output_path, workflow_json, thumbnail_path=None):
+    """Save generation metadata to the database through the shared connection."""
     # Use output_path as thumbnail if not specified
     if thumbnail_path is None:
         thumbnail_path = output_path
 
-    # Use INSERT OR REPLACE to handle re-saving the same generation
-    conn.execute('''
-        INSERT OR REPLACE INTO generations (id, prompt, negative_prompt, model, width, height, seed, steps, cfg_scale, sampler, output_path, thumbnail_path, workflow_json)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (gen_id, prompt, negative_prompt, model, width, height, seed, steps, cfg_scale, sampler, output_path, thumbnail_path, workflow_json))
-
-    conn.commit()
-    conn.close()
+    # The shared WAL connection commits on leaving the block
+    with generations_db_lock, get_generations_db() as conn:
+        conn.execute(GENERATION_INSERT_SQL, (gen_id, prompt, negative_prompt, model, width, height, seed, steps,
+                                             cfg_scale, sampler, output_path, thumbnail_path, workflow_json))
 
 
 # ============================================
@@ -5513,14 +6282,80 @@ def save_generation(gen_id, prompt, negative_prompt, model, width, height, seed,
 # Theme Customization API
 # =============================================================================
 
+def read_json_cached(path, cache):
+    """Parse a JSON file, reusing the cached result while its mtime and size are unchanged.
+
+    The result is shared between requests and must not be modified; copy it
+    with copy.deepcopy() first. Returns None if the file is missing or cannot
+    be parsed.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (st.st_mtime_ns, st.st_size)
+    cached_key, cached_data = cache['entry']
+    if cached_key == key:
+        return cached_data
+    try:
+        with open(path, 'rb') as f:
+            data = fast_json_loads(f.read())
+    except (ValueError, IOError):
+        return None
+    cache['entry'] = (key, data)
+    return data
+
+
+def remember_json_cache(path, cache, data):
+    """Record data as the cached contents of path right after writing it."""
+    st = os.stat(path)
+    cache['entry'] = ((st.st_mtime_ns, st.st_size), data)
+
+
+def write_json_atomic(path, cache, data):
+    """Write data as pretty JSON to path and remember it in cache.
+
+    data is only cached once the file has been replaced, so a failed write
+    leaves the previous contents cached. The caller must not modify data
+    afterwards. The payload goes to a per-thread temp file in one write and is renamed
+    over path, so concurrent readers see either the old or the new file,
+    never a truncated one.
+    """
+    path = os.fspath(path)
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    payload = fast_json_dumps(data, indent=True)
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        os.unlink(tmp_path)
+        raise
+    remember_json_cache(path, cache, data)
+
+
+# Parsed THEMES_FILE, keyed on (mtime_ns, size)
+_themes_cache = {'entry': (None, None)}
+
+# Theme id slugging: whitespace runs become '-', anything else non-slug is dropped
+THEME_SLUG_SPACES_PATTERN = re.compile(r'\s+')
+THEME_SLUG_INVALID_PATTERN = re.compile(r'[^a-z0-9-]')
+
+
 def load_themes():
-    """Load themes from JSON file."""
-    if THEMES_FILE.exists():
-        try:
-            with open(THEMES_FILE) as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            pass
+    """Load themes from JSON file.
+
+    The parsed file is cached and shared between requests, so the result
+    must not be modified; use load_themes_for_update() for that.
+    """
+    data = read_json_cached(THEMES_FILE, _themes_cache)
+    if data is not None:
+        return data
     # Return default structure
     return {
         "active": "teal-gold",
@@ -5535,25 +6370,41 @@ def load_themes():
     }
 
 
+def load_themes_for_update():
+    """Return a private copy of load_themes() to modify and pass to save_themes()."""
+    return copy.deepcopy(load_themes())
+
+
+def themes_for_request():
+    """load_themes(), fetched at most once per request via flask.g.
+
+    Later calls in the same request skip even the mtime stat. Read-only, like
+    load_themes().
+    """
+    if 'themes' not in g:
+        g.themes = load_themes()
+    return g.themes
+
+
 def save_themes(data):
     """Save themes to JSON file."""
-    THEMES_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(THEMES_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    write_json_atomic(THEMES_FILE, _themes_cache, data)
+    if 'themes' in g:
+        g.themes = data
 
 
 @app.route('/api/themes')
 def api_themes_list():
     """Get all saved themes."""
-    themes_data = load_themes()
-    return jsonify({
+    themes_data = themes_for_request()
+    return fast_jsonify({
         'active': themes_data.get('active'),
         'themes': {
             key: {
                 'name': theme.get('name', key),
                 'prompt': theme.get('prompt', '')
             }
-            for key, theme in themes_data.get('themes', {}).items()
+            for key, theme in (themes_data.get('themes') or {}).items()
         }
     })
 
@@ -5561,11 +6412,11 @@ def api_themes_list():
 @app.route('/api/themes/<theme_id>')
 def api_theme_get(theme_id):
     """Get a specific theme's full data."""
-    themes_data = load_themes()
+    themes_data = themes_for_request()
     theme = themes_data.get('themes', {}).get(theme_id)
     if not theme:
         return jsonify({'error': 'Theme not found'}), 404
-    return jsonify(theme)
+    return fast_jsonify(theme)
 
 
 @app.route('/api/themes/generate', methods=['POST'])
@@ -5614,16 +6465,19 @@ def api_themes_save():
 
     # Generate a slug from the theme name
     name = theme.get('name', 'Custom Theme')
-    theme_id = name.lower().replace(' ', '-')
-    theme_id = re.sub(r'[^a-z0-9-]', '', theme_id)
-
-    # Make unique if needed
-    themes_data = load_themes()
-    base_id = theme_id
-    counter = 1
-    while theme_id in themes_data.get('themes', {}):
-        theme_id = f"{base_id}-{counter}"
-        counter += 1
+    theme_id = THEME_SLUG_INVALID_PATTERN.sub('', THEME_SLUG_SPACES_PATTERN.sub('-', name.lower()))
+    if not theme_id.strip('-'):
+        # Name had no usable characters (e.g. only punctuation or emoji)
+        theme_id = 'custom-theme'
+
+    # Make unique if needed by taking the next free numeric suffix
+    themes_data = load_themes_for_update()
+    existing = themes_data.get('themes', {})
+    if theme_id in existing:
+        base_id = theme_id
+        suffix_pattern = re.compile(rf'{re.escape(base_id)}-(\d+)')
+        suffixes = [int(m.group(1)) for m in map(suffix_pattern.fullmatch, existing) if m]
+        theme_id = f"{base_id}-{max(suffixes, default=0) + 1}"
 
     # Save the theme
     if 'themes' not in themes_data:
@@ -5631,6 +6485,7 @@ def api_themes_save():
     themes_data['themes'][theme_id] = theme
 
     save_themes(themes_data)
+    ttyd_command_for.cache_clear()
 
     return jsonify({
         'success': True,
@@ -5648,12 +6503,14 @@ def api_themes_apply():
     if not theme_id:
         return jsonify({'error': 'Theme ID is required'}), 400
 
-    themes_data = load_themes()
+    themes_data = load_themes_for_update()
     if theme_id not in themes_data.get('themes', {}):
         return jsonify({'error': 'Theme not found'}), 404
 
-    themes_data['active'] = theme_id
-    save_themes(themes_data)
+    # Re-applying the active theme needs no write
+    if themes_data.get('active') != theme_id:
+        themes_data['active'] = theme_id
+        save_themes(themes_data)
 
     theme = themes_data['themes'][theme_id]
     return jsonify({
@@ -5669,7 +6526,7 @@ def api_themes_delete(theme_id):
     if theme_id == 'teal-gold':
         return jsonify({'error': 'Cannot delete the default theme'}), 400
 
-    themes_data = load_themes()
+    themes_data = load_themes_for_update()
     if theme_id not in themes_data.get('themes', {}):
         return jsonify({'error': 'Theme not found'}), 404
 
@@ -5690,7 +6547,7 @@ def api_themes_delete(theme_id):
 @app.route('/api/themes/active')
 def api_themes_active():
     """Get the currently active theme's full data."""
-    themes_data = load_themes()
+    themes_data = themes_for_request()
     active_id = themes_data.get('active', 'teal-gold')
     theme = themes_data.get('themes', {}).get(active_id)
 
@@ -5699,26 +6556,42 @@ def api_themes_active():
         theme = DEFAULT_THEME if DEFAULT_THEME else {}
         active_id = 'teal-gold'
 
-    return jsonify({
+    # Fetched on every page load; let browsers revalidate with If-None-Match
+    return conditional_jsonify({
         'theme_id': active_id,
         'theme': theme
     })
 
 
+@lru_cache(maxsize=64)
+def ttyd_command_for(ttyd_items):
+    """Memoized generate_ttyd_service_command() keyed on the ttyd theme's items.
+
+    Items are kept in dict order (not sorted) because that order is what
+    ends up in the generated theme JSON.
+    """
+    return generate_ttyd_service_command(dict(ttyd_items))
+
+
 @app.route('/api/themes/ttyd-command')
 def api_themes_ttyd_command():
     """Get the ttyd service update command for the current theme."""
     if not THEME_GENERATOR_AVAILABLE:
         return jsonify({'error': 'Theme generator not available'}), 500
 
-    themes_data = load_themes()
+    themes_data = themes_for_request()
     active_id = themes_data.get('active', 'teal-gold')
     theme = themes_data.get('themes', {}).get(active_id)
 
     if not theme or 'ttyd' not in theme:
         return jsonify({'error': 'No ttyd theme data available'}), 404
 
-    command = generate_ttyd_service_command(theme['ttyd'])
+    ttyd = theme['ttyd']
+    try:
+        command = ttyd_command_for(tuple(ttyd.items()))
+    except TypeError:
+        # Unhashable values in a hand-edited theme; skip the cache
+        command = generate_ttyd_service_command(ttyd)
     return jsonify({
         'command': command,
         'theme_id': active_id
@@ -5731,31 +6604,89 @@ def api_themes_ttyd_command():
 
 TERMINAL_SESSIONS_FILE = PROJECT_ROOT / 'data' / 'terminal_sessions.json'
 
+# Typed into every new top-session window
+TERMINAL_INIT_COMMAND = 'conda activate boom_env && claude --dangerously-skip-permissions'
+
+# Operations accepted by /api/terminal/windows/batch
+TERMINAL_BATCH_OPS = frozenset({'new', 'select', 'rename', 'close'})
+
+# Create the state directories once here instead of on every save
+for _state_dir in {THEMES_FILE.parent, TERMINAL_SESSIONS_FILE.parent}:
+    try:
+        _state_dir.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.warning("Could not create %s: %s", _state_dir, e)
+
+# Parsed TERMINAL_SESSIONS_FILE, keyed on (mtime_ns, size)
+_terminal_sessions_cache = {'entry': (None, None)}
+
 
 def get_terminal_sessions():
-    """Load terminal session metadata from JSON file."""
-    if TERMINAL_SESSIONS_FILE.exists():
-        try:
-            return json.loads(TERMINAL_SESSIONS_FILE.read_text())
-        except (json.JSONDecodeError, IOError):
-            pass
+    """Load terminal session metadata from JSON file.
+
+    Cached and shared like load_themes(), so the result must not be
+    modified; use get_terminal_sessions_for_update() for that.
+    """
+    data = read_json_cached(TERMINAL_SESSIONS_FILE, _terminal_sessions_cache)
+    if data is not None:
+        return data
     return {"windows": {}, "active_window": "0"}
 
 
+def get_terminal_sessions_for_update():
+    """Return a private copy of get_terminal_sessions() to modify and save."""
+    return copy.deepcopy(get_terminal_sessions())
+
+
 def save_terminal_sessions(data):
     """Save terminal session metadata to JSON file."""
-    TERMINAL_SESSIONS_FILE.write_text(json.dumps(data, indent=2))
+    write_json_atomic(TERMINAL_SESSIONS_FILE, _terminal_sessions_cache, data)
+
+
+# How long a tmux list-windows result is reused by get_tmux_windows()
+TMUX_WINDOWS_TTL = 1.0
+
+# (monotonic timestamp, windows) from the last list-windows call
+_tmux_windows_cache = {'entry': (0.0, None)}
+
 
+def invalidate_tmux_windows():
+    """Forget the cached window list after creating/closing/selecting windows."""
+    _tmux_windows_cache['entry'] = (0.0, None)
 
-def get_tmux_windows():
-    """Get list of tmux windows from dashboard-top session."""
+
+def get_tmux_windows(max_age=TMUX_WINDOWS_TTL):
+    """Get (window_index, is_active) pairs for the dashboard-top session.
+
+    Both come from a single list-windows call using tmux's own active flag.
+    Results are reused for up to max_age seconds so polling the window list
+    doesn't fork a tmux process per request; pass max_age=0 to force a fresh
+    listing.
+    """
+    fetched_at, windows = _tmux_windows_cache['entry']
+    now = time.monotonic()
+    if windows is not None and now - fetched_at < max_age:
+        return windows
+    windows = _list_tmux_windows()
+    _tmux_windows_cache['entry'] = (now, windows)
+    return windows
+
+
+def _list_tmux_windows():
+    """Run tmux list-windows for the dashboard-top session."""
     try:
         result = subprocess.run(
-            ['tmux', 'list-windows', '-t', 'dashboard-top', '-F', '#{window_index}'],
-            capture_output=True, text=True, timeout=5
+            ['tmux', 'list-windows', '-t', 'dashboard-top', '-F', '#{window_index}|#{?window_active,1,0}'],
+            capture_output=True, timeout=5
         )
         if result.returncode == 0:
-            return [w.strip() for w in result.stdout.strip().split('\n') if w.strip()]
+            # Indices and flags are plain ASCII, so skip text-mode decoding
+            windows = []
+            for line in result.stdout.splitlines():
+                wid, _, active = line.strip().partition(b'|')
+                if wid:
+                    windows.append((wid.decode('ascii'), active == b'1'))
+            return windows
     except (subprocess.TimeoutExpired, FileNotFoundError):
         pass
     return []
@@ -5768,16 +6699,18 @@ def api_terminal_windows():
     tmux_windows = get_tmux_windows()
 
     # Sync: build list from actual tmux windows, use saved names if available
-    windows = []
-    for wid in tmux_windows:
-        name = sessions.get('windows', {}).get(wid, {}).get('name', f'Terminal {int(wid)+1}')
-        windows.append({
+    saved = sessions.get('windows', {})
+    windows = [
+        {
             'id': wid,
-            'name': name,
-            'active': wid == sessions.get('active_window', '0')
-        })
+            'name': saved.get(wid, {}).get('name', f'Terminal {int(wid)+1}'),
+            'active': is_active
+        }
+        for wid, is_active in tmux_windows
+    ]
 
-    return jsonify({'windows': windows})
+    # Polled by the terminal page; idle polls revalidate to a 304
+    return conditional_jsonify({'windows': windows})
 
 
 @app.route('/api/terminal/windows', methods=['POST'])
@@ -5811,12 +6744,14 @@ def api_terminal_create():
             # Initialize the new window with conda env and claude
             subprocess.run(
                 ['tmux', 'send-keys', '-t', f'dashboard-top:{window_id}',
-                 'conda activate boom_env && claude --dangerously-skip-permissions', 'Enter'],
+                 TERMINAL_INIT_COMMAND, 'Enter'],
                 capture_output=True, timeout=5
             )
 
+            invalidate_tmux_windows()
+
             # Save metadata
-            sessions = get_terminal_sessions()
+            sessions = get_terminal_sessions_for_update()
             sessions.setdefault('windows', {})[window_id] = {'name': name}
             sessions['active_window'] = window_id
             save_terminal_sessions(sessions)
@@ -5829,6 +6764,130 @@ def api_terminal_create():
     return jsonify({'error': 'Failed to create window'}), 500
 
 
+@app.route('/api/terminal/windows/batch', methods=['POST'])
+def api_terminal_batch():
+    """Apply several window operations with a single tmux invocation.
+
+    Request body:
+        ops: list of {op: 'new', name} | {op: 'select', id} |
+             {op: 'rename', id, name} | {op: 'close', id}
+
+    The tmux commands for all ops are chained with ';' into one tmux
+    process, and terminal_sessions.json is written once at the end. Window
+    ids are checked up front; if tmux still fails part way, the metadata is
+    reconciled with the windows that actually exist and the 500 response
+    lists any windows that were created before the failure.
+    """
+    data = request.get_json() or {}
+    ops = data.get('ops')
+    if not isinstance(ops, list) or not ops:
+        return jsonify({'error': 'ops list required'}), 400
+
+    for op in ops:
+        if not isinstance(op, dict) or op.get('op') not in TERMINAL_BATCH_OPS:
+            return jsonify({'error': f'Unsupported op: {op!r}'}), 400
+        if op['op'] != 'new' and not str(op.get('id', '')).isdigit():
+            return jsonify({'error': f"{op['op']} needs a numeric window id"}), 400
+        if op['op'] == 'rename' and not op.get('name'):
+            return jsonify({'error': 'Name required'}), 400
+
+    # Every referenced window must exist (and not be closed earlier in the
+    # batch), since tmux aborts the rest of the chain at the first bad target
+    tmux_windows = get_tmux_windows(max_age=0)
+    known_ids = {wid for wid, _ in tmux_windows}
+    for op in ops:
+        if op['op'] != 'new':
+            window_id = str(op['id'])
+            if window_id not in known_ids:
+                return jsonify({'error': f'Window {window_id} not found'}), 404
+            if op['op'] == 'close':
+                known_ids.discard(window_id)
+
+    # Don't allow closing last window
+    closes = sum(op['op'] == 'close' for op in ops)
+    creates = sum(op['op'] == 'new' for op in ops)
+    if closes and closes >= len(tmux_windows) + creates:
+        return jsonify({'error': 'Cannot close last window'}), 400
+
+    args = []
+    for op in ops:
+        window_id = str(op.get('id', ''))
+        if op['op'] == 'new':
+            # new-window makes the window current, so send-keys can target the session
+            commands = [
+                ['new-window', '-t', 'dashboard-top', '-P', '-F', '#{window_index}'],
+                ['new-window', '-t', 'dashboard-bottom'],
+                ['send-keys', '-t', 'dashboard-top', TERMINAL_INIT_COMMAND, 'Enter'],
+            ]
+        elif op['op'] == 'select':
+            commands = [
+                ['select-window', '-t', f'dashboard-top:{window_id}'],
+                ['select-window', '-t', f'dashboard-bottom:{window_id}'],
+            ]
+        elif op['op'] == 'close':
+            commands = [
+                ['kill-window', '-t', f'dashboard-top:{window_id}'],
+                ['kill-window', '-t', f'dashboard-bottom:{window_id}'],
+            ]
+        else:
+            # Names only live in terminal_sessions.json
+            commands = []
+        for command in commands:
+            if args:
+                args.append(';')
+            args.extend(command)
+
+    created = []
+    error = None
+    if args:
+        try:
+            result = subprocess.run(['tmux'] + args, capture_output=True, text=True, timeout=10)
+        except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+            return jsonify({'error': f'tmux error: {str(e)}'}), 500
+        finally:
+            invalidate_tmux_windows()
+        # Ids printed by the new-window commands that ran
+        created = result.stdout.split()
+        if result.returncode != 0:
+            # tmux stops at the first failing command; earlier ones have run
+            error = f'tmux error: {result.stderr.strip()}'
+
+    # After a failure, only record what tmux actually did
+    live = dict(get_tmux_windows(max_age=0)) if error else None
+
+    sessions = get_terminal_sessions_for_update()
+    windows = sessions.setdefault('windows', {})
+    new_ids = iter(created)
+    new_windows = []
+    for op in ops:
+        window_id = str(op.get('id', ''))
+        if op['op'] == 'new':
+            window_id = next(new_ids, None)
+            if window_id is None:
+                # tmux stopped before creating this one
+                continue
+            name = op.get('name', 'New Terminal')
+            windows[window_id] = {'name': name}
+            sessions['active_window'] = window_id
+            new_windows.append({'id': window_id, 'name': name})
+        elif op['op'] == 'select':
+            sessions['active_window'] = window_id
+        elif op['op'] == 'rename':
+            if live is None or window_id in live:
+                windows[window_id] = {'name': op['name']}
+        elif live is None or window_id not in live:
+            windows.pop(window_id, None)
+    if live:
+        sessions['active_window'] = next(
+            (wid for wid, is_active in live.items() if is_active), sessions.get('active_window', '0')
+        )
+    save_terminal_sessions(sessions)
+
+    if error:
+        return jsonify({'error': error, 'created': new_windows}), 500
+    return jsonify({'success': True, 'created': new_windows})
+
+
 @app.route('/api/terminal/windows/<window_id>', methods=['PUT'])
 def api_terminal_rename(window_id):
     """Rename terminal window."""
@@ -5836,9 +6895,11 @@ def api_terminal_rename(window_id):
     name = data.get('name', '')
 
     if name:
-        sessions = get_terminal_sessions()
-        sessions.setdefault('windows', {})[window_id] = {'name': name}
-        save_terminal_sessions(sessions)
+        sessions = get_terminal_sessions_for_update()
+        windows = sessions.setdefault('windows', {})
+        if windows.get(window_id) != {'name': name}:
+            windows[window_id] = {'name': name}
+            save_terminal_sessions(sessions)
         return jsonify({'success': True})
 
     return jsonify({'error': 'Name required'}), 400
@@ -5848,7 +6909,7 @@ def api_terminal_rename(window_id):
 def api_terminal_close(window_id):
     """Close terminal window from BOTH paired sessions."""
     # Don't allow closing last window
-    tmux_windows = get_tmux_windows()
+    tmux_windows = get_tmux_windows(max_age=0)
     if len(tmux_windows) <= 1:
         return jsonify({'error': 'Cannot close last window'}), 400
 
@@ -5856,17 +6917,18 @@ def api_terminal_close(window_id):
         # Kill window in both sessions
         subprocess.run(
             ['tmux', 'kill-window', '-t', f'dashboard-top:{window_id}'],
-            capture_output=True, timeout=5
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5
         )
         subprocess.run(
             ['tmux', 'kill-window', '-t', f'dashboard-bottom:{window_id}'],
-            capture_output=True, timeout=5
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5
         )
     except (subprocess.TimeoutExpired, FileNotFoundError):
         pass
+    invalidate_tmux_windows()
 
     # Remove from metadata
-    sessions = get_terminal_sessions()
+    sessions = get_terminal_sessions_for_update()
     sessions.get('windows', {}).pop(window_id, None)
     save_terminal_sessions(sessions)
 
@@ -5880,16 +6942,17 @@ def api_terminal_select(window_id):
         # Select in both sessions to keep them in sync
         subprocess.run(
             ['tmux', 'select-window', '-t', f'dashboard-top:{window_id}'],
-            capture_output=True, timeout=5
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5
         )
         subprocess.run(
             ['tmux', 'select-window', '-t', f'dashboard-bottom:{window_id}'],
-            capture_output=True, timeout=5
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5
         )
     except (subprocess.TimeoutExpired, FileNotFoundError):
         pass
+    invalidate_tmux_windows()
 
-    sessions = get_terminal_sessions()
+    sessions = get_terminal_sessions_for_update()
     sessions['active_window'] = window_id
     save_terminal_sessions(sessions)
 
@@ -6466,7 +7529,6 @@ def api_automation_update_job(job_id):
         # Handle config specially - convert dict to JSON string
         updates = {}
         if 'config' in data:
-            import json
             updates['config_json'] = json.dumps(data['config'])
         if 'enabled' in data:
             updates['enabled'] = 1 if data['enabled'] else 0
@@ -7229,7 +8291,6 @@ def api_pm_delete_attachment(task_id, attachment_id):
 @app.route('/api/pm/browse-directories')
 def api_pm_browse_directories():
     """Browse directories for linking to projects/areas"""
-    import os
     from pathlib import Path
 
     path = request.args.get('path', '/home/pds')
@@ -7282,7 +8343,6 @@ def api_pm_browse_directories():
 def api_pm_create_directory():
     """Create a new directory"""
     from pathlib import Path
-    import re
 
     data = request.get_json() or {}
     parent_path = data.get('parent', '/home/pds')
@@ -7439,7 +8499,6 @@ def api_pm_stats():
 @app.route('/api/dev-port')
 def api_dev_port():
     """Get next available dev server port."""
-    import socket
     PORT_RANGE = (4000, 4019)
 
     for port in range(PORT_RANGE[0], PORT_RANGE[1] + 1):
@@ -7453,7 +8512,6 @@ def api_dev_port():
 @app.route('/api/dev-port/list')
 def api_dev_port_list():
     """List all dev ports and their status."""
-    import socket
     PORT_RANGE = (4000, 4019)
 
     ports = []
@@ -7661,8 +8719,6 @@ def send_to_openclaw(message: str, phone_number: str, channel: str = 'sms', cont
         channel: The channel name (sms, whatsapp, etc.)
         contact_name: Optional contact name to include in context
     """
-    import subprocess
-    import json
     import shlex
 
     try:
@@ -7765,7 +8821,7 @@ def sms_webhook():
     if not allowlist_entry:
         logger.info(f"Ignoring SMS from non-allowlisted number: {from_number}")
         # Return empty TwiML response (no reply)
-        resp = MessagingResponse()
+        resp = twiml_response()
         return str(resp), 200, {'Content-Type': 'text/xml'}
 
     # Get contact name for context
@@ -7783,7 +8839,7 @@ def sms_webhook():
     log_sms_message(from_number, 'outbound', ai_response)
 
     # Send response via TwiML
-    resp = MessagingResponse()
+    resp = twiml_response()
     resp.message(ai_response)
 
     return str(resp), 200, {'Content-Type': 'text/xml'}
@@ -7815,7 +8871,7 @@ def whatsapp_webhook():
     allowlist_entry = get_sms_allowlist_entry(from_number)
     if not allowlist_entry:
         logger.info(f"Ignoring WhatsApp from non-allowlisted number: {from_number}")
-        resp = MessagingResponse()
+        resp = twiml_response()
         return str(resp), 200, {'Content-Type': 'text/xml'}
 
     # Get contact name for context
@@ -7833,7 +8889,7 @@ def whatsapp_webhook():
     log_sms_message(from_number, 'outbound', ai_response)
 
     # Send response via TwiML
-    resp = MessagingResponse()
+    resp = twiml_response()
     resp.message(ai_response)
 
     return str(resp), 200, {'Content-Type': 'text/xml'}
@@ -7842,6 +8898,7 @@ def whatsapp_webhook():
 @app.route('/api/sms/send', methods=['POST'])
 def api_sms_send():
     """Send an outbound SMS (adds recipient to allowlist)."""
+    twilio_client = get_twilio_client()
     if not twilio_client:
         return jsonify({'error': 'Twilio not configured'}), 503
 
@@ -7982,6 +9039,7 @@ def api_sms_conversation(phone_number):
 @app.route('/api/sms/status', methods=['GET'])
 def api_sms_status():
     """Get SMS system status."""
+    twilio_client = get_twilio_client()
     return jsonify({
         'twilio_available': TWILIO_AVAILABLE,
         'twilio_configured': twilio_client is not None,
@@ -0,0 +1,141 @@
+"""
+Tests for the batched terminal window endpoint in Boomshakalaka Dashboard.
+
+tmux is not needed: subprocess.run is replaced with a fake tmux server.
+
+Run with: pytest dashboard/tests/test_terminal_batch.py -v
+"""
+
+import json
+import subprocess
+import pytest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from dashboard import server
+from dashboard.server import app
+
+
+class FakeTmux:
+    """Stand-in for subprocess.run that models tmux windows by index."""
+
+    def __init__(self, windows, fail_on=None):
+        self.windows = list(windows)
+        self.active = self.windows[-1]
+        self.fail_on = fail_on
+        self.batches = []
+
+    def __call__(self, args, capture_output=False, text=False, timeout=None, **kwargs):
+        if args[1] == 'list-windows':
+            out = ''.join(f'{wid}|{int(wid == self.active)}\n' for wid in self.windows)
+            return subprocess.CompletedProcess(args, 0, out.encode('ascii'), b'')
+
+        self.batches.append(args[1:])
+        commands, current = [], []
+        for arg in args[1:]:
+            if arg == ';':
+                commands.append(current)
+                current = []
+            else:
+                current.append(arg)
+        commands.append(current)
+
+        # Like tmux, stop at the first failing command
+        stdout = []
+        for command in commands:
+            if self.fail_on and command[0] == self.fail_on[0] and command[-1] == self.fail_on[1]:
+                return subprocess.CompletedProcess(args, 1, '\n'.join(stdout), "can't find window")
+            if command[0] == 'new-window' and command[2] == 'dashboard-top':
+                wid = str(max(int(w) for w in self.windows) + 1)
+                self.windows.append(wid)
+                self.active = wid
+                stdout.append(wid)
+            elif command[0] == 'kill-window' and command[2].startswith('dashboard-top:'):
+                self.windows.remove(command[2].split(':')[1])
+            elif command[0] == 'select-window' and command[2].startswith('dashboard-top:'):
+                self.active = command[2].split(':')[1]
+        return subprocess.CompletedProcess(args, 0, '\n'.join(stdout), '')
+
+
+@pytest.fixture
+def sessions_file(tmp_path, monkeypatch):
+    """Point terminal session storage at a temp file."""
+    path = tmp_path / 'terminal_sessions.json'
+    path.write_text(json.dumps({'windows': {'0': {'name': 'Main'}, '1': {'name': 'Logs'}}, 'active_window': '1'}))
+    monkeypatch.setattr(server, 'TERMINAL_SESSIONS_FILE', path)
+    monkeypatch.setitem(server._terminal_sessions_cache, 'entry', (None, None))
+    server.invalidate_tmux_windows()
+    yield path
+    server.invalidate_tmux_windows()
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask app."""
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+class TestTerminalBatch:
+    """Test POST /api/terminal/windows/batch."""
+
+    def test_runs_all_ops_in_one_tmux_call(self, client, sessions_file):
+        """All ops should be chained into one tmux invocation and saved once."""
+        tmux = FakeTmux(['0', '1'])
+        with mock.patch.object(server.subprocess, 'run', tmux):
+            response = client.post('/api/terminal/windows/batch', json={'ops': [
+                {'op': 'new', 'name': 'Build'},
+                {'op': 'rename', 'id': '0', 'name': 'Shell'},
+                {'op': 'close', 'id': '1'},
+            ]})
+
+        assert response.status_code == 200
+        assert response.get_json()['created'] == [{'id': '2', 'name': 'Build'}]
+        assert len(tmux.batches) == 1
+        saved = json.loads(sessions_file.read_text())
+        assert saved['windows'] == {'0': {'name': 'Shell'}, '2': {'name': 'Build'}}
+        assert saved['active_window'] == '2'
+
+    def test_rejects_unknown_window_before_running_tmux(self, client, sessions_file):
+        """An op on a missing window should fail without running any tmux command."""
+        tmux = FakeTmux(['0', '1'])
+        with mock.patch.object(server.subprocess, 'run', tmux):
+            response = client.post('/api/terminal/windows/batch', json={'ops': [
+                {'op': 'new', 'name': 'X'},
+                {'op': 'close', 'id': '99'},
+            ]})
+
+        assert response.status_code == 404
+        assert tmux.batches == []
+        assert tmux.windows == ['0', '1']
+
+    def test_rejects_invalid_ops(self, client, sessions_file):
+        """Unknown ops and non-numeric ids should be rejected with 400."""
+        with mock.patch.object(server.subprocess, 'run', FakeTmux(['0'])):
+            assert client.post('/api/terminal/windows/batch', json={'ops': []}).status_code == 400
+            assert client.post('/api/terminal/windows/batch', json={'ops': [{'op': 'split'}]}).status_code == 400
+            assert client.post('/api/terminal/windows/batch', json={'ops': [{'op': 'close', 'id': 'x'}]}).status_code == 400
+
+    def test_partial_failure_records_created_windows(self, client, sessions_file):
+        """Windows created before tmux fails should be saved and returned."""
+        # Window 1 passes validation but tmux fails to select it (e.g. closed meanwhile)
+        tmux = FakeTmux(['0', '1'], fail_on=('select-window', 'dashboard-top:1'))
+        with mock.patch.object(server.subprocess, 'run', tmux):
+            response = client.post('/api/terminal/windows/batch', json={'ops': [
+                {'op': 'new', 'name': 'X'},
+                {'op': 'select', 'id': '1'},
+                {'op': 'new', 'name': 'Y'},
+            ]})
+
+        assert response.status_code == 500
+        data = response.get_json()
+        assert data['created'] == [{'id': '2', 'name': 'X'}]
+        assert 'error' in data
+        saved = json.loads(sessions_file.read_text())
+        assert saved['windows']['2'] == {'name': 'X'}
+        assert saved['active_window'] == '2'
@@ -6,12 +6,62 @@ import subprocess
 import shutil
 import json
 import logging
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List, Dict
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=256)
+def _probe_video(ffprobe_path: str, video_path: str, mtime_ns: int, size: int) -> Dict:
+    """
+    Run ffprobe once per file version.
+
+    The mtime/size arguments are part of the cache key so a regenerated file
+    at the same path is probed again.
+    """
+    cmd = [
+        ffprobe_path,
+        '-v', 'quiet',
+        '-print_format', 'json',
+        '-show_format',
+        '-show_streams',
+        video_path
+    ]
+
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+@lru_cache(maxsize=256)
+def _probe_last_keyframe(ffprobe_path: str, video_path: str, mtime_ns: int, size: int) -> Optional[float]:
+    """
+    Find the timestamp of the last video keyframe.
+
+    Only packet headers are read (no decoding), so this is cheap even for
+    long clips. Returns None if no keyframe could be found.
+    """
+    cmd = [
+        ffprobe_path,
+        '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'packet=pts_time,flags',
+        '-of', 'csv=p=0',
+        video_path
+    ]
+
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    for line in reversed(result.stdout.splitlines()):
+        pts_time, _, flags = line.partition(',')
+        if 'K' in flags:
+            try:
+                return float(pts_time)
+            except ValueError:
+                continue
+    return None
+
+
 class VideoUtils:
     """FFmpeg wrapper for video processing operations."""
 
@@ -38,17 +88,8 @@ class VideoUtils:
         if not video_path.exists():
             raise FileNotFoundError(f"Video not found: {video_path}")
 
-        cmd = [
-            self.ffprobe_path,
-            '-v', 'quiet',
-            '-print_format', 'json',
-            '-show_format',
-            '-show_streams',
-            str(video_path)
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        data = json.loads(result.stdout)
+        st = video_path.stat()
+        data = _probe_video(self.ffprobe_path, str(video_path), st.st_mtime_ns, st.st_size)
 
         # Find video stream
         video_stream = next(
@@ -97,10 +138,12 @@ class VideoUtils:
         # Ensure output directory exists
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
+        # -ss before -i is an input seek: ffmpeg stops after decoding one frame
         cmd = [
             self.ffmpeg_path, '-y',
+            '-ss', '0',
             '-i', str(video_path),
-            '-vframes', '1',
+            '-frames:v', '1',
             '-q:v', '2',  # High quality
             str(output_path)
         ]
@@ -129,25 +172,47 @@ class VideoUtils:
         if not video_path.exists():
             raise FileNotFoundError(f"Video not found: {video_path}")
 
-        # Get video info to find duration
-        info = self.get_video_info(video_path)
-        duration = info['duration']
-        fps = info['fps'] or 24
-
-        # Seek to slightly before the end (1-2 frames before)
-        seek_time = max(0, duration - (2 / fps))
-
         # Ensure output directory exists
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        cmd = [
-            self.ffmpeg_path, '-y',
-            '-ss', str(seek_time),
-            '-i', str(video_path),
-            '-vframes', '1',
-            '-q:v', '2',  # High quality
-            str(output_path)
-        ]
+        st = video_path.stat()
+        try:
+            keyframe_time = _probe_last_keyframe(self.ffprobe_path, str(video_path), st.st_mtime_ns, st.st_size)
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"Could not probe keyframes for {video_path}: {e.stderr}")
+            keyframe_time = None
+
+        if keyframe_time is not None:
+            # Input-seek to the last keyframe, then decode only that GOP.
+            # -update 1 keeps overwriting the image, so what remains is the
+            # exact final frame.
+            cmd = [
+                self.ffmpeg_path, '-y',
+                '-ss', str(keyframe_time),
+                '-i', str(video_path),
+                '-update', '1',
+                '-q:v', '2',  # High quality
+                str(output_path)
+            ]
+        else:
+            # Get video info to find duration (cached per file version)
+            info = self.get_video_info(video_path)
+            duration = info['duration']
+            fps = info['fps'] or 24
+
+            # Seek to slightly before the end (1-2 frames before)
+            seek_time = max(0, duration - (2 / fps))
+
+            # Input seek (-ss before -i) jumps straight to the tail instead of
+            # decoding the whole file
+            cmd = [
+                self.ffmpeg_path, '-y',
+                '-ss', str(seek_time),
+                '-i', str(video_path),
+                '-frames:v', '1',
+                '-q:v', '2',  # High quality
+                str(output_path)
+            ]
 
         result = subprocess.run(cmd, capture_output=True, text=True)
         if result.returncode != 0:
@@ -220,8 +285,64 @@ class VideoUtils:
 
         if crossfade_frames > 0:
             return self._concatenate_with_crossfade(video_paths, output_path, crossfade_frames)
-        else:
+        elif self._streams_match(video_paths):
+            # Same codec/size/pixel format: the concat demuxer can stream-copy
             return self._concatenate_simple(video_paths, output_path)
+        else:
+            return self._concatenate_reencode(video_paths, output_path)
+
+    def _video_stream(self, video_path: Path) -> Dict:
+        """Return the first video stream's ffprobe entry (cached per file version)."""
+        video_path = Path(video_path)
+        st = video_path.stat()
+        data = _probe_video(self.ffprobe_path, str(video_path), st.st_mtime_ns, st.st_size)
+        return next(
+            (s for s in data.get('streams', []) if s.get('codec_type') == 'video'),
+            {}
+        )
+
+    def _streams_match(self, video_paths: List[Path]) -> bool:
+        """Check whether all videos can be joined with -c copy."""
+        keys = {
+            tuple(stream.get(k) for k in ('codec_name', 'width', 'height', 'pix_fmt'))
+            for stream in map(self._video_stream, video_paths)
+        }
+        return len(keys) == 1
+
+    def _concatenate_reencode(self, video_paths: List[Path], output_path: Path) -> Path:
+        """Concatenate videos with differing codecs/sizes via the concat filter (re-encodes)."""
+        first = self._video_stream(video_paths[0])
+        width = first.get('width') or 768
+        height = first.get('height') or 768
+
+        inputs = []
+        for vp in video_paths:
+            inputs.extend(['-i', str(vp)])
+
+        # Normalize every input to the first clip's size before joining
+        n = len(video_paths)
+        scaled = ''.join(f"[{i}:v]scale={width}:{height},setsar=1[v{i}];" for i in range(n))
+        joined = ''.join(f"[v{i}]" for i in range(n))
+        filter_complex = f"{scaled}{joined}concat=n={n}:v=1:a=0[out]"
+
+        cmd = [
+            self.ffmpeg_path, '-y',
+            *inputs,
+            '-filter_complex', filter_complex,
+            '-map', '[out]',
+            '-c:v', 'libx264',
+            '-crf', '19',
+            '-preset', 'fast',
+            '-pix_fmt', 'yuv420p',
+            str(output_path)
+        ]
+
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            logger.error(f"FFmpeg concat filter error: {result.stderr}")
+            raise RuntimeError(f"Failed to concatenate videos: {result.stderr}")
+
+        return output_path
 
     def _concatenate_simple(self, video_paths: List[Path], output_path: Path) -> Path:
         """Simple concatenation without re-encoding (fast, lossless if same codec)."""